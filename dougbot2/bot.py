@@ -20,7 +20,8 @@ from typing import Any, Callable, Optional
 
 import aiohttp
 from asgiref.sync import sync_to_async
-from discord import Forbidden, Game, Guild, Intents, Message
+from discord import Forbidden, Game, Guild, Intents, Member, Message, Role
+from discord.abc import GuildChannel
 from discord.ext.commands import Bot, CommandInvokeError, CommandNotFound
 from django.conf import settings
 from django.core.cache import caches
@@ -35,7 +36,9 @@ from .exts.papertrail import Papertrail
 from .models import Server
 from .utils.async_ import async_get_or_create
 from .utils.duckcord import Color2, Embed2
+from .utils.events import stop_responders
 from .utils.importutil import get_submodule_from_apps
+from .utils.response import permission_cache
 
 
 async def _which_prefix(bot: Bot, msg: Message):
@@ -230,6 +233,24 @@ class Robot(Bot, _MissionControl):
     async def on_guild_available(self, guild: Guild):
         await self._ensure_server(guild)
 
+    async def on_guild_channel_update(
+        self, before: GuildChannel, after: GuildChannel
+    ):
+        permission_cache.invalidate_channel(after.guild.id, after.id)
+
+    async def on_guild_channel_delete(self, channel: GuildChannel):
+        permission_cache.invalidate_channel(channel.guild.id, channel.id)
+
+    async def on_guild_role_update(self, before: Role, after: Role):
+        permission_cache.invalidate_guild(after.guild.id)
+
+    async def on_guild_role_delete(self, role: Role):
+        permission_cache.invalidate_guild(role.guild.id)
+
+    async def on_member_update(self, before: Member, after: Member):
+        if after.id == self.user.id:
+            permission_cache.invalidate_guild(after.guild.id)
+
     def get_cache_key(self, **keys):
         """Format a prefixed string to be used as a redis cache key."""
         args = [f"{k}={v}" for k, v in keys.items()]
@@ -249,6 +270,11 @@ class Robot(Bot, _MissionControl):
         key = self.get_cache_key(**keys)
         self._cache.delete(key, version=self._CACHE_VERSION)
 
+    async def close(self):
+        """Stop all background responders before closing the client."""
+        await stop_responders()
+        return await super().close()
+
     async def set_exit_status(self):
         """Set the bot's presence to indicate that the bot is about to shutdown."""
         await self.change_presence(activity=Game("System Restart. Please hold."))
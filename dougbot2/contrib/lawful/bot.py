@@ -14,19 +14,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import asyncio
 import io
 import re
-from collections import defaultdict, deque
+import tempfile
+import time
+from collections import OrderedDict, defaultdict, deque
 from contextlib import contextmanager, suppress
 from datetime import datetime
-from typing import Literal, Optional, Union
+from html import escape
+from typing import IO, Awaitable, Literal, Optional, Union
 from urllib.parse import urlsplit
 
 import attr
-import pandas as pd
 import pytz
 import simplejson as json
-from bs4 import BeautifulSoup
 from discord import (
     AllowedMentions,
     CategoryChannel,
@@ -36,7 +38,6 @@ from discord import (
     Member,
     Message,
     Object,
-    PartialMessage,
     PermissionOverwrite,
     Role,
     StageChannel,
@@ -50,6 +51,7 @@ from more_itertools import first
 
 from dougbot2.discord.cog import Gear
 from dougbot2.discord.context import Circumstances
+from dougbot2.exceptions import NotAcceptable
 from dougbot2.exts import autodoc as doc
 from dougbot2.utils.common import (
     Embed2,
@@ -60,6 +62,7 @@ from dougbot2.utils.common import (
     chapterize_items,
     code,
     iter_urls,
+    shorten_list,
     strong,
     tag,
     timestamp,
@@ -68,19 +71,17 @@ from dougbot2.utils.common import (
     utcnow,
 )
 from dougbot2.utils.converters import Choice, Datetime
+from dougbot2.utils.english import pluralize
 from dougbot2.utils.markdown import TIMESTAMP_PROCESSOR
 
 from .. import facts
+from .rules import get_rules_path, load_rules
+from .snapshots import _Channel, _Role, get_snapshot_store, guild_records, same_state
+from .stats import MessageStats
 
 AnyChannel = Union[TextChannel, VoiceChannel, StageChannel, CategoryChannel]
 
 
-def shorten_list(items: list[str], size: int) -> list[str]:
-    if len(items) <= size:
-        return items
-    return [*items[:size], f"({len(items) - size} more)"]
-
-
 def subchannels(*channels: AnyChannel):
     for c in channels:
         if isinstance(c, CategoryChannel):
@@ -99,30 +100,90 @@ class StreamClock:
         return self.stream.dst()
 
 
-def domain_under(d: str, matches: list[str]) -> bool:
-    return any(d == dx or d.endswith(f".{dx}") for dx in matches)
+class FloodBuckets:
+    """Recent messages of each author, kept for a limited time.
+
+    Buckets are ordered by the time they were last appended to. Buckets
+    that have not been appended to within the window are dropped, and
+    the least recently active buckets are evicted beyond `max_size`.
+    """
 
+    def __init__(self, threshold: int, window: float, max_size: int):
+        self.threshold = threshold
+        self.window = window
+        self.max_size = max_size
+        self._buckets: OrderedDict[int, tuple[float, deque[tuple[int, int]]]]
+        self._buckets = OrderedDict()
 
-@attr.s(auto_attribs=True)
-class _Channel:
-    id: int
-    kind: str
-    name: str
-    desc: Optional[str]
-    cat: Optional[int]
-    perms: dict[int, tuple[int, int]]
-    order: int
+    def __len__(self):
+        return len(self._buckets)
+
+    def expire(self, now: float):
+        while self._buckets:
+            touched, _ = next(iter(self._buckets.values()))
+            if now - touched <= self.window:
+                break
+            self._buckets.popitem(last=False)
+
+    def add(self, user_id: int, msg: Message) -> Optional[list[tuple[int, int]]]:
+        """Record a message and return the author's bucket if it is full.
+
+        A bucket is full when it has at least `threshold` messages,
+        all of which were created within the window.
+        """
+        now = utcnow().timestamp()
+        self.expire(now)
+        _, bucket = self._buckets.pop(user_id, (None, None))
+        if bucket is None:
+            bucket = deque(maxlen=self.threshold)
+        bucket.append((msg.channel.id, msg.id))
+        while bucket and now - snowflake_time(bucket[0][1]).timestamp() > self.window:
+            bucket.popleft()
+        self._buckets[user_id] = (now, bucket)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        if len(bucket) < self.threshold:
+            return None
+        return [*bucket]
 
 
-@attr.s(auto_attribs=True)
-class _Role:
-    id: int
-    name: int
-    color: int
-    perms: int
-    order: int
-    hoisted: bool
-    pingable: bool
+def channel_priority(channel: AnyChannel) -> tuple[bool, bool, int]:
+    """Sort key that puts public text channels before everything else."""
+    public = channel.permissions_for(channel.guild.default_role).view_channel
+    return (not isinstance(channel, TextChannel), not public, channel.position)
+
+
+class BulkChannelEdit:
+    """Channel edits that are run concurrently.
+
+    At most `concurrency` edits are in flight at once; edits are
+    started in order of `channel_priority`.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.edits: list[tuple[AnyChannel, dict]] = []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def add(self, channel: AnyChannel, **options):
+        self.edits.append((channel, options))
+
+    async def run(self) -> list[tuple[AnyChannel, Exception]]:
+        """Run all edits and return the ones that failed."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def edit(channel: AnyChannel, options: dict):
+            async with semaphore:
+                await channel.edit(**options)
+
+        edits = sorted(self.edits, key=lambda e: channel_priority(e[0]))
+        results = await asyncio.gather(
+            *[edit(c, options) for c, options in edits],
+            return_exceptions=True,
+        )
+        return [(c, e) for (c, _), e in zip(edits, results) if isinstance(e, Exception)]
 
 
 @contextmanager
@@ -142,12 +203,16 @@ class Lawful(
     description="Exclusive to the Doug District.",
 ):
     RE_EVERYONE = re.compile(r"@everyone|@here")
+    WARN_TIMEOUT = 5
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.flood_buckets: defaultdict[int, deque[tuple[int, int]]] = defaultdict(
-            lambda: deque(maxlen=3)
-        )
+        self.rules = load_rules()
+        self.flood_buckets = self._create_flood_buckets()
+
+    def _create_flood_buckets(self) -> FloodBuckets:
+        flood = self.rules.flood
+        return FloodBuckets(flood.threshold, flood.window, flood.max_buckets)
 
     @command("ontime", aliases=("whenstream",))
     @doc.description("Show when Doug usually streams in your local time.")
@@ -185,34 +250,65 @@ class Lawful(
             await self.discord_domain_security(after)
             await self.everyone_ping_spam(after)
 
-    WHITELISTED_DOMAINS = (
-        "discord.com",
-        "discordapp.com",
-        "discord.gg",
-        "discord.gift",
-        "discord.gifts",
-        "dis.gd",
-        "discordstatus.com",
-        "discord.media",
-        "discordpy.readthedocs.io",
-        "discord.new",
-        "discordmerch.com",
-    )
-    RE_SUSPICIOUS_DOMAIN = re.compile(
-        r"d.?[i1l].?s+.?[ck].?[o0].?r.?(?:d|cl)", re.IGNORECASE
-    )
-
     def _test_discord_url(self, text: str) -> Optional[str]:
-        suspicious = None
+        if "://" not in text:
+            return None
+        rules = self.rules.phishing
         for u in iter_urls(text):
             url = urlsplit(u)
             domain = url.netloc
-            if bool(self.RE_SUSPICIOUS_DOMAIN.match(domain)) and not domain_under(
-                domain, self.WHITELISTED_DOMAINS
-            ):
-                suspicious = url.geturl()
-                break
-        return suspicious
+            if rules.patterns.match(domain) and domain not in rules.whitelist:
+                return url.geturl()
+        return None
+
+    async def _gather_actions(self, *actions: Awaitable) -> list[bool]:
+        """Run actions concurrently and return whether each of them succeeded."""
+        results = await asyncio.gather(*actions, return_exceptions=True)
+        for e in results:
+            if isinstance(e, Exception):
+                self.log.warning(e, exc_info=e)
+        return [not isinstance(r, BaseException) for r in results]
+
+    async def _delete_bucket(self, guild: Guild, bucket: list[tuple[int, int]]):
+        """Delete bucketed messages, in bulk for messages in the same channel."""
+        by_channel: defaultdict[int, set[int]] = defaultdict(set)
+        for channel_id, id_ in bucket:
+            by_channel[channel_id].add(id_)
+        channels: dict[int, TextChannel] = {
+            channel_id: guild.get_channel(channel_id) for channel_id in by_channel
+        }
+        deletions = [
+            channel.delete_messages([Object(id_) for id_ in by_channel[channel_id]])
+            for channel_id, channel in channels.items()
+            if channel
+        ]
+        succeeded = await self._gather_actions(*deletions)
+        if not all(channels.values()) or not all(succeeded):
+            raise RuntimeError("Some of the messages could not be deleted.")
+
+    def _bulk_edit(self) -> BulkChannelEdit:
+        return BulkChannelEdit(self.rules.bulk.concurrency)
+
+    async def _run_bulk_edits(self, ctx: Circumstances, *phases: BulkChannelEdit):
+        """Run bulk edits one phase after another and report the results."""
+        total = sum(len(p) for p in phases)
+        progress = await ctx.send(f"Applying {total} channel edits")
+        started = time.perf_counter()
+        failed: list[tuple[AnyChannel, Exception]] = []
+        for i, phase in enumerate(phases, start=1):
+            failed.extend(await phase.run())
+            if i < len(phases):
+                await progress.edit(
+                    content=f"Applying {total} channel edits ({i}/{len(phases)})"
+                )
+        elapsed = time.perf_counter() - started
+        for c, e in failed:
+            self.log.warning(f"Error editing channel {c}: {e}", exc_info=e)
+        res = f"Applied {total - len(failed)}/{total} channel edits in {elapsed:.1f}s"
+        if failed:
+            errors = [f"{c.mention} ({type(e).__name__})" for c, e in failed]
+            res = f'{res}\n:warning: Failed: {" ".join(shorten_list(errors, 15))}'
+        await progress.edit(content=res)
 
     async def discord_domain_security(self, msg: Message):
         author: Member = msg.author
@@ -235,41 +331,28 @@ class Lawful(
             " (usually within 48 hours)."
         )
 
-        try:
-            await msg.delete()
-        except Exception as e:
-            self.log.warning(e, exc_info=e)
-            did_delete = False
-        else:
-            did_delete = True
-
-        try:
-            await author.send(REASON)
-        except Exception as e:
-            self.log.warning(e, exc_info=e)
-            did_warn = False
-        else:
-            did_warn = True
-
-        try:
-            await author.ban(
+        # The DM can't be delivered once the author is banned, so the ban
+        # waits for it (briefly); the message is deleted in the meantime.
+        did_warn, did_delete = await self._gather_actions(
+            asyncio.wait_for(author.send(REASON), timeout=self.WARN_TIMEOUT),
+            msg.delete(),
+        )
+        (did_ban,) = await self._gather_actions(
+            author.ban(
                 reason="Scam/phishing: compromised account", delete_message_days=0
-            )
-        except Exception as e:
-            self.log.warning(e, exc_info=e)
-            did_ban = False
-        else:
-            did_ban = True
+            ),
+        )
 
         what = (
             strong(
                 f"Message contains URL {code(suspicious)}, whose domain is not whitelisted."
             )
-            + f'\nWhitelisted domains are: {", ".join(self.WHITELISTED_DOMAINS)}'
+            + f'\nWhitelisted domains are: {", ".join(self.rules.phishing.whitelist)}'
         )
 
         report = (
             Embed2(title="Security: Suspicious URL: Scam/phishing")
+            .builder()
             .add_field(name="Who", value=tag(author), inline=False)
             .add_field(name="Where", value=tag(msg.channel), inline=True)
             .add_field(
@@ -288,6 +371,7 @@ class Lawful(
             )
             .set_timestamp()
             .decorated(guild)
+            .build()
         )
 
         notif_channel: TextChannel = guild.get_channel(facts.CHANNEL_BOT_STUFF)
@@ -305,21 +389,11 @@ class Lawful(
             return
         if not self.RE_EVERYONE.search(msg.content):
             return
-        bucket = self.flood_buckets[msg.author.id]
-        bucket.append((msg.channel.id, msg.id))
-        if len(bucket) < 3:
-            return
-        previous_timestamps = [snowflake_time(id_).timestamp() for _, id_ in bucket]
-        if datetime.now().timestamp() - min(previous_timestamps) > 180:
+        if not (bucket := self.flood_buckets.add(msg.author.id, msg)):
             return
 
         guild: Guild = msg.guild
         mute: Role = guild.get_role(facts.ROLE_MUTED)
-        msgs = [
-            PartialMessage(channel=guild.get_channel(channel_id), id=id_)
-            for channel_id, id_ in bucket
-        ]
-
         REASON = (
             f'{strong("Doug District: Security")}'
             "\n\nYou have been muted for spamming @everyone. The last message was:"
@@ -327,28 +401,23 @@ class Lawful(
             f"\n\nMods will review the messages and see if you should be unmuted."
         )
 
-        for m in msgs:
-            try:
-                await m.delete()
-            except Exception:
-                did_delete = False
-            else:
-                did_delete = True
-
-        try:
-            await msg.author.add_roles(mute, reason="Spamming @everyone")
-            await msg.author.send(REASON)
-        except Exception:
-            did_mute = False
-        else:
-            did_mute = True
+        (did_mute,) = await self._gather_actions(
+            msg.author.add_roles(mute, reason="Spamming @everyone"),
+        )
+        did_warn, did_delete = await self._gather_actions(
+            msg.author.send(REASON),
+            self._delete_bucket(guild, bucket),
+        )
 
+        flood = self.rules.flood
         what = strong(
-            "Sending 3 or more messages containing @everyone within 3 minutes"
+            f"Sending {flood.threshold} or more messages containing @everyone"
+            f" within {flood.window:g} {pluralize(flood.window, 'second')}"
         )
 
         report = (
             Embed2(title="Security: @everyone spam")
+            .builder()
             .add_field(name="Who", value=tag(msg.author), inline=False)
             .add_field(name="Where", value=tag(msg.channel), inline=True)
             .add_field(
@@ -358,6 +427,7 @@ class Lawful(
             )
             .add_field(name="What", value=what, inline=False)
             .add_field(name="Deleted", value=traffic_light(did_delete))
+            .add_field(name="Notified", value=traffic_light(did_warn))
             .add_field(name="Muted", value=traffic_light(did_mute))
             .add_field(
                 name="Original message",
@@ -366,6 +436,7 @@ class Lawful(
             )
             .set_timestamp()
             .decorated(guild)
+            .build()
         )
 
         notif_channel: TextChannel = guild.get_channel(facts.CHANNEL_BOT_STUFF)
@@ -385,6 +456,23 @@ class Lawful(
         if msg.author == guild.owner:
             await msg.publish()
 
+    @command("lawrules")
+    @doc.description("Reload moderation rules from the instance directory.")
+    @doc.hidden
+    @doc.restriction(is_owner)
+    async def reload_rules(self, ctx: Circumstances):
+        try:
+            self.rules = load_rules()
+            self.flood_buckets = self._create_flood_buckets()
+        except Exception as e:
+            raise NotAcceptable(f"Error loading {get_rules_path()}: {e}")
+        phishing = self.rules.phishing
+        res = (
+            f"Loaded {strong(len(phishing.whitelist))} whitelisted domains"
+            f" and pattern {code(phishing.patterns.pattern)}"
+        )
+        return await ctx.respond(content=res).success().run()
+
     @command("slice")
     @doc.description("Export a slice of channel messages as an HTML file")
     @doc.argument("start", "The beginning message (included).")
@@ -398,7 +486,7 @@ class Lawful(
         end: Message,
     ):
         if start.channel != end.channel:
-            raise doc.NotAcceptable("Messages are in different channels.")
+            raise NotAcceptable("Messages are in different channels.")
         STYLESHEET = """
         html {
             color: #d3d3d3;
@@ -461,76 +549,90 @@ class Lawful(
             f' {start_time.strftime("%c")}'
             f' to {end_time.strftime("%c")}'
         )
-        soup = BeautifulSoup(
-            f"""
+        head = f"""
             <!DOCTYPE html>
             <html lang="en">
             <head>
                 <meta charset="UTF-8">
                 <meta http-equiv="X-UA-Compatible" content="IE=edge">
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>{title}</title>
+                <title>{escape(title)}</title>
                 <style>{STYLESHEET}</style>
             </head>
             <body>
                 <article>
                     <header>
-                        <h2 class="channel-name">#general</h2>
+                        <h2 class="channel-name">#{escape(channel.name)}</h2>
                         <p>
                             From: <em class="time-range">{start_time.strftime("%c")}</em>
                             <br>
                             To: <em class="time-range">{end_time.strftime("%c")}</em>
                             <br>
-                            Timezone: <em class="time-range">Pacific</em>
+                            Timezone: <em class="time-range">{escape(str(tz))}</em>
                         </p>
                         <p>
                             Content descriptors: <strong>__</strong>
                         </p>
                     </header>
+        """
+        tail = """
                 </article>
             </body>
             </html>
-        """,
-            features="lxml",
-        )
-        body = soup.html.body.article
-        async with ctx.typing():
-            async for msg in channel.history(
-                limit=None, after=Object(start.id - 1), before=end, oldest_first=True
-            ):
-                msg: Message
+        """
+
+        def write_chunk(stream: IO[bytes], chunk: list[Message]):
+            lines: list[str] = []
+            for msg in chunk:
                 ctime = assumed_utc(msg.created_at).astimezone(tz)
-                timestamp = soup.new_tag(
-                    "time", attrs={"class": "message-time"}, datetime=ctime.isoformat()
-                )
-                timestamp.append(ctime.strftime("%y/%m/%d %H:%M:%S %Z"))
-                author = soup.new_tag(
-                    "span",
-                    attrs={
-                        "class": "message-author",
-                        "data-user-id": str(msg.author.id),
-                    },
-                    title=msg.author.display_name,
-                    style=f"color: #{msg.author.color.value:06x};",
+                author = msg.author
+                lines.append(
+                    '<p class="message">'
+                    f'<time class="message-time" datetime="{ctime.isoformat()}">'
+                    f'{ctime.strftime("%y/%m/%d %H:%M:%S %Z")}</time>'
+                    '<span class="message-main">'
+                    f'<span class="message-author" data-user-id="{author.id}"'
+                    f' title="{escape(author.display_name)}"'
+                    f' style="color: #{author.color.value:06x};">'
+                    f"<strong>{escape(str(author))}</strong></span>"
+                    f'<code class="message-content" data-msg-id="{msg.id}">'
+                    f"{escape(msg.content)}</code>"
+                    "</span></p>\n"
                 )
-                author_name = soup.new_tag("strong")
-                author_name.append(str(msg.author))
-                author.append(author_name)
-                content = soup.new_tag(
-                    "code",
-                    attrs={"class": "message-content", "data-msg-id": str(msg.id)},
+            stream.write("".join(lines).encode())
+
+        limit = self.rules.export.max_slice_size or None
+        chunk_size = self.rules.export.chunk_size
+        count = 0
+        with tempfile.TemporaryFile() as stream:
+            stream.write(head.encode())
+            async with ctx.typing():
+                chunk: list[Message] = []
+                async for msg in channel.history(
+                    limit=limit,
+                    after=Object(start.id - 1),
+                    before=Object(end.id + 1),
+                    oldest_first=True,
+                ):
+                    chunk.append(msg)
+                    if len(chunk) >= chunk_size:
+                        await asyncio.to_thread(write_chunk, stream, chunk)
+                        count += len(chunk)
+                        chunk = []
+                await asyncio.to_thread(write_chunk, stream, chunk)
+                count += len(chunk)
+            stream.write(tail.encode())
+            if stream.tell() > ctx.guild.filesize_limit:
+                raise NotAcceptable(
+                    f"The exported file ({stream.tell()} bytes) is larger than"
+                    f" the upload limit of this server ({ctx.guild.filesize_limit}"
+                    " bytes). Try exporting a smaller slice."
                 )
-                content.append(msg.content)
-                main = soup.new_tag("span", attrs={"class": "message-main"})
-                main.extend([author, content])
-                container = soup.new_tag("p", attrs={"class": "message"})
-                container.extend([timestamp, main])
-                body.append(container)
-        with io.StringIO(str(soup)) as stream:
             stream.seek(0)
-            filename = f"{title}.html"
-            file = File(stream, filename=filename)
-            await ctx.send(file=file)
+            content = None
+            if limit is not None and count >= limit:
+                content = f"Export is truncated to the first {limit} messages."
+            await ctx.send(content, file=File(stream, filename=f"{title}.html"))
 
     @command("stats")
     @doc.hidden
@@ -542,7 +644,6 @@ class Lawful(
         channel: TextChannel = guild.get_channel(channel_id)
         start_date = datetime.fromtimestamp(start)
         end_date = datetime.fromtimestamp(end) if end else datetime.now()
-        data: list[tuple[int, str, datetime, int, bool, str, bool, bool]] = []
 
         def is_subscriber(author: Member):
             if not hasattr(author, "roles"):
@@ -554,93 +655,36 @@ class Lawful(
                 return False
             return facts.ROLE_BOOSTER in (r.id for r in author.roles)
 
-        async with ctx.typing():
-            async for msg in channel.history(
-                limit=None, after=start_date, before=end_date
-            ):
-                msg: Message
-                author_id = msg.author.id
-                author = str(msg.author)
-                timestamp = assumed_utc(msg.created_at)
-                length = len(msg.content)
-                has_uploads = bool(msg.attachments)
-                link = msg.jump_url
-                sub = is_subscriber(msg.author)
-                boost = is_booster(msg.author)
-                data.append(
-                    (
-                        author_id,
-                        author,
-                        timestamp,
-                        length,
-                        has_uploads,
-                        link,
-                        sub,
-                        boost,
-                    )
-                )
-
-        df = pd.DataFrame(
-            data,
-            columns=[
-                "author_id",
-                "author",
-                "timestamp",
-                "length",
-                "has_uploads",
-                "link",
-                "subscriber",
-                "booster",
-            ],
-        )
-        num_messages = df.loc[:, "author"].value_counts().rename("num_messages")
-        num_chars = df.groupby(["author"]).sum().loc[:, "length"].rename("num_chars")
-        by_hour = (
-            df.set_index("timestamp")
-            .groupby([pd.Grouper(freq="1H"), "author"])["author_id"]
-            .agg(lambda c: 1)
-            .unstack()
-            .fillna(0)
-            .sum()
-            .rename("active_hours")
-            .astype(int)
-        )
-        by_day = (
-            df.set_index("timestamp")
-            .groupby([pd.Grouper(freq="1D"), "author"])["author_id"]
-            .agg(lambda c: 1)
-            .unstack()
-            .fillna(0)
-            .sum()
-            .rename("active_days")
-            .astype(int)
-        )
-        subscribers = (
-            df.groupby("author")
-            .first()
-            .loc[:, "subscriber"]
-            .map({True: "yes", False: "no"})
-        )
-        boosters = (
-            df.groupby("author")
-            .first()
-            .loc[:, "booster"]
-            .map({True: "yes", False: "no"})
-        )
-        summaries = pd.concat(
-            [num_messages, num_chars, by_hour, by_day, subscribers, boosters],
-            axis="columns",
-        )
         file1 = (
             f"counts.{channel.name}.{start_date.isoformat()}.{end_date.isoformat()}.csv"
         )
         file2 = (
             f"stats.{channel.name}.{start_date.isoformat()}.{end_date.isoformat()}.csv"
         )
-        with open_file(df.to_csv().encode(), file1) as f1, open_file(
-            summaries.to_csv().encode(), file2
-        ) as f2:
-            return await ctx.send(files=[f1, f2])
+        with tempfile.TemporaryFile() as stream:
+            stats = MessageStats(stream)
+            async with ctx.typing():
+                async for msg in channel.history(
+                    limit=None, after=start_date, before=end_date
+                ):
+                    msg: Message
+                    chunk = stats.append(
+                        author_id=msg.author.id,
+                        author=str(msg.author),
+                        timestamp=assumed_utc(msg.created_at),
+                        length=len(msg.content),
+                        has_uploads=bool(msg.attachments),
+                        link=msg.jump_url,
+                        subscriber=is_subscriber(msg.author),
+                        booster=is_booster(msg.author),
+                    )
+                    if chunk:
+                        await asyncio.to_thread(stats.consume, chunk)
+                await asyncio.to_thread(stats.consume, stats.take())
+                summaries = await asyncio.to_thread(stats.summarize)
+            stream.seek(0)
+            with open_file(summaries, file2) as f2:
+                return await ctx.send(files=[File(stream, file1), f2])
 
     @command("roster")
     @doc.description("List all members of a role.")
@@ -741,45 +785,139 @@ class Lawful(
     async def pickle(self, ctx: Circumstances):
         guild: Guild = ctx.guild
 
-        channels = []
-        for c in guild.channels:
-            c: AnyChannel
-            perms = {}
-            for r, p in c.overwrites.items():
-                if not isinstance(r, Role):
-                    continue
-                allowed, denied = PermissionOverride.upgrade(p).pair()
-                perms[r.id] = (allowed.value, denied.value)
-            channel = _Channel(
-                c.id,
-                type(c).__name__,
-                c.name,
-                getattr(c, "topic", None),
-                c.category_id,
-                perms,
-                c.position,
-            )
-            channels.append(attr.asdict(channel))
-
-        roles = []
-        for r in guild.roles:
-            r: Role
-            role = _Role(
-                r.id,
-                r.name,
-                r.color.value,
-                r.permissions.value,
-                r.position,
-                r.hoist,
-                r.mentionable,
-            )
-            roles.append(attr.asdict(role))
+        records = guild_records(guild)
+        store = get_snapshot_store()
+        snapshot_id, created = await asyncio.to_thread(store.save, guild.id, records)
 
-        info = {"channels": channels, "roles": roles}
+        info = {"channels": [], "roles": []}
+        for kind, record in records:
+            info[f"{kind}s"].append(attr.asdict(record))
+        res = (
+            f"Saved snapshot {strong(snapshot_id)}"
+            f" ({created} of {len(records)} objects changed)"
+        )
         with open_file(
             json.dumps(info).encode(), f"export.{utcnow().isoformat()}.json"
         ) as f:
-            return await ctx.send(file=f)
+            return await ctx.send(res, file=f)
+
+    @command("snapshots")
+    @doc.description("List recent snapshots of this server.")
+    @doc.restriction(is_owner)
+    @doc.hidden
+    async def snapshots(self, ctx: Circumstances):
+        store = get_snapshot_store()
+        history = await asyncio.to_thread(store.history, ctx.guild.id)
+        if not history:
+            return await ctx.send("No snapshots saved for this server.")
+        lines = [
+            f"{strong(id_)} {timestamp(created, 'full')}" for id_, created in history
+        ]
+        return await ctx.send("\n".join(lines))
+
+    @command("rewind")
+    @doc.description("Restore channels and roles that changed since a snapshot.")
+    @doc.argument("snapshot_id", "The snapshot to restore.")
+    @doc.restriction(is_owner)
+    @doc.hidden
+    async def rewind(self, ctx: Circumstances, snapshot_id: int):
+        guild: Guild = ctx.guild
+        store = get_snapshot_store()
+        snapshot = await asyncio.to_thread(store.load, guild.id, snapshot_id)
+        if not snapshot:
+            raise NotAcceptable(f"There is no snapshot {snapshot_id} for this server.")
+
+        mapped: dict[int, Union[AnyChannel, Role]] = {}
+
+        def get_role(role_id: int) -> Optional[Role]:
+            return mapped.get(role_id) or guild.get_role(role_id)
+
+        def get_channel(channel_id: Optional[int]) -> Optional[AnyChannel]:
+            if channel_id is None:
+                return None
+            return mapped.get(channel_id) or guild.get_channel(channel_id)
+
+        def get_overrides(c: _Channel) -> dict[Role, PermissionOverride]:
+            overrides = {}
+            for role_id, (allowed, denied) in c.perms.items():
+                if not (role := get_role(role_id)):
+                    continue
+                overrides[role] = PermissionOverride.from_pair(
+                    Permissions2(allowed), Permissions2(denied)
+                )
+            return overrides
+
+        roles_updated = 0
+        for r in sorted(snapshot.roles.values(), key=lambda r: r.order, reverse=True):
+            current = guild.get_role(r.id)
+            if current and same_state(_Role.from_role(current), r):
+                continue
+            options = {"permissions": Permissions2(r.perms)}
+            if not current or not current.is_default():
+                options.update(
+                    name=r.name,
+                    colour=r.color,
+                    hoist=r.hoisted,
+                    mentionable=r.pingable,
+                )
+            try:
+                if current:
+                    await current.edit(**options)
+                else:
+                    mapped[r.id] = await guild.create_role(**options)
+            except Exception as e:
+                await ctx.send(f":warning: Error restoring role {r.name}: {e}")
+                continue
+            roles_updated += 1
+
+        create = {
+            "CategoryChannel": Guild.create_category,
+            "TextChannel": Guild.create_text_channel,
+            "VoiceChannel": Guild.create_voice_channel,
+            "StageChannel": Guild.create_stage_channel,
+        }
+        channels_created = 0
+        for c in sorted(
+            filter(lambda c: not guild.get_channel(c.id), snapshot.channels.values()),
+            key=lambda c: (c.kind != "CategoryChannel", c.order),
+        ):
+            kwargs = {
+                "name": c.name,
+                "overwrites": get_overrides(c),
+                "position": c.order,
+            }
+            if c.kind != "CategoryChannel":
+                kwargs["category"] = get_channel(c.cat)
+            if c.kind == "TextChannel":
+                kwargs["topic"] = c.desc
+            try:
+                mapped[c.id] = await create[c.kind](guild, **kwargs)
+            except Exception as e:
+                await ctx.send(f":warning: Error creating channel {c.name}: {e}")
+                continue
+            channels_created += 1
+
+        await ctx.send(
+            f"Snapshot {strong(snapshot.id)}: restored {roles_updated} roles"
+            f" and recreated {channels_created} channels"
+        )
+
+        edits = self._bulk_edit()
+        for c in snapshot.channels.values():
+            if not (current := guild.get_channel(c.id)):
+                continue
+            if same_state(_Channel.from_channel(current), c):
+                continue
+            members = {
+                k: v for k, v in current.overwrites.items() if not isinstance(k, Role)
+            }
+            options = {"name": c.name, "overwrites": {**members, **get_overrides(c)}}
+            if c.kind != "CategoryChannel":
+                options["category"] = get_channel(c.cat)
+            if c.kind == "TextChannel":
+                options["topic"] = c.desc
+            edits.add(current, **options)
+        await self._run_bulk_edits(ctx, edits)
 
     @command("unpickle")
     @doc.restriction(is_owner)
@@ -841,6 +979,7 @@ class Lawful(
             mapped[c.id] = created
 
         await ctx.send("Assigning categories")
+        edits = self._bulk_edit()
         for c in filter(lambda c: c.kind != "CategoryChannel", channels):
             if not c.cat:
                 continue
@@ -854,12 +993,8 @@ class Lawful(
                     f":warning: Skipping channel {c.name} as it was not created"
                 )
                 continue
-            try:
-                await channel.edit(category=category)
-            except Exception as e:
-                await ctx.send(
-                    f":warning: Error assigning category {c.cat} - {c.name}: {e}"
-                )
+            edits.add(channel, category=category)
+        await self._run_bulk_edits(ctx, edits)
 
         await ctx.send("Assigning positions")
         for c in sorted(
@@ -897,10 +1032,12 @@ class Lawful(
     ):
         overrides = {r: PermissionOverwrite(read_messages=False) for r in targets}
         exemptions = {c.id for c in exemptions}
+        edits = self._bulk_edit()
         for c in ctx.guild.channels:
             if c.id in exemptions:
                 continue
-            await c.edit(overwrites={**c.overwrites, **overrides})
+            edits.add(c, overwrites={**c.overwrites, **overrides})
+        await self._run_bulk_edits(ctx, edits)
 
     @command("restore")
     @doc.restriction(is_owner)
@@ -910,10 +1047,12 @@ class Lawful(
     ):
         overrides = {r: PermissionOverwrite(read_messages=None) for r in targets}
         exemptions = {c.id for c in exemptions}
+        edits = self._bulk_edit()
         for c in ctx.guild.channels:
             if c.id in exemptions:
                 continue
-            await c.edit(overwrites={**c.overwrites, **overrides})
+            edits.add(c, overwrites={**c.overwrites, **overrides})
+        await self._run_bulk_edits(ctx, edits)
 
     @command("rollback")
     @doc.restriction(is_owner)
@@ -1280,52 +1419,56 @@ class Lawful(
             ),
         }
 
-        await announcement.edit(overwrites=broadcasting_perms)
-        await content.edit(overwrites=broadcasting_perms)
-        await tweets.edit(overwrites=broadcasting_perms)
-        await server_news.edit(overwrites=broadcasting_perms)
-        await welcome.edit(overwrites=welcome_perms)
-        await role_assignment.edit(overwrites=role_assignment_perms)
-        await verification.edit(overwrites=verification_perms)
-
-        await hangouts.edit(overwrites=regular_perms)
-        for c in hangouts.channels:
-            await c.edit(sync_permissions=True)
-        await elites_club.edit(overwrites=elevated_perms)
-
-        await seasonal.edit(overwrites=game_event_perms)
-        for c in seasonal.channels:
-            await c.edit(sync_permissions=True)
-        await game_event_info.edit(overwrites=game_event_info_perms)
-        await game_event_org.edit(overwrites=game_event_org_perms)
-
-        await serious.edit(overwrites=regular_perms)
-        for c in serious.channels:
-            await c.edit(sync_permissions=True)
-
-        await suggestions.edit(overwrites=suggestion_perms)
-        for c in suggestions.channels:
-            await c.edit(sync_permissions=True)
-        await submit_and_discuss.edit(overwrites=regular_perms)
-
-        await minecraft.edit(overwrites=minecraft_perms)
-        for c in minecraft.channels:
-            await c.edit(sync_permissions=True)
-        await mc_info.edit(overwrites=mc_info_perms)
-        await mc_suggest.edit(overwrites=mc_suggest_perms)
-        await mc_coder.edit(overwrites=mc_coder_perms)
-        await mc_builder.edit(overwrites=mc_builder_perms)
-        await mc_devs.edit(overwrites=mc_devs_perms)
-        await mc_mods.edit(overwrites=mc_mods_perms)
-        await mc_dev_room.edit(overwrites=mc_devs_perms)
-
-        await voice_channels.edit(overwrites=regular_perms)
-        for c in minecraft.channels:
-            await c.edit(sync_permissions=True)
-        await nightbot.edit(overwrites=elevated_perms)
-
-        await tahiti_text.edit(overwrites=tahiti_perms)
-        await tahiti.edit(overwrites=tahiti_perms)
+        # Categories are updated first so that channels synced to them
+        # pick up the new overwrites; channel-specific overwrites
+        # are applied last.
+        categories = self._bulk_edit()
+        categories.add(hangouts, overwrites=regular_perms)
+        categories.add(seasonal, overwrites=game_event_perms)
+        categories.add(serious, overwrites=regular_perms)
+        categories.add(suggestions, overwrites=suggestion_perms)
+        categories.add(minecraft, overwrites=minecraft_perms)
+        categories.add(voice_channels, overwrites=regular_perms)
+
+        channels = self._bulk_edit()
+        channels.add(announcement, overwrites=broadcasting_perms)
+        channels.add(content, overwrites=broadcasting_perms)
+        channels.add(tweets, overwrites=broadcasting_perms)
+        channels.add(server_news, overwrites=broadcasting_perms)
+        channels.add(welcome, overwrites=welcome_perms)
+        channels.add(role_assignment, overwrites=role_assignment_perms)
+        channels.add(verification, overwrites=verification_perms)
+        channels.add(elites_club, overwrites=elevated_perms)
+        channels.add(game_event_info, overwrites=game_event_info_perms)
+        channels.add(game_event_org, overwrites=game_event_org_perms)
+        channels.add(submit_and_discuss, overwrites=regular_perms)
+        channels.add(mc_info, overwrites=mc_info_perms)
+        channels.add(mc_suggest, overwrites=mc_suggest_perms)
+        channels.add(mc_coder, overwrites=mc_coder_perms)
+        channels.add(mc_builder, overwrites=mc_builder_perms)
+        channels.add(mc_devs, overwrites=mc_devs_perms)
+        channels.add(mc_mods, overwrites=mc_mods_perms)
+        channels.add(mc_dev_room, overwrites=mc_devs_perms)
+        channels.add(nightbot, overwrites=elevated_perms)
+        channels.add(tahiti_text, overwrites=tahiti_perms)
+        channels.add(tahiti, overwrites=tahiti_perms)
+
+        # Channels with their own overwrites don't need to be synced first.
+        explicit = {c.id for c, _ in channels.edits}
+        synced = self._bulk_edit()
+        for category in (
+            hangouts,
+            seasonal,
+            serious,
+            suggestions,
+            minecraft,
+            voice_channels,
+        ):
+            for c in category.channels:
+                if c.id not in explicit:
+                    synced.add(c, sync_permissions=True)
+
+        await self._run_bulk_edits(ctx, categories, synced, channels)
 
     # @command('rimraf')
     # @doc.hidden
@@ -0,0 +1,138 @@
+# rules.py
+# Copyright (C) 2022  @tonyzbf +https://github.com/tonyzbf/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Moderation rules for the Lawful extension.
+
+Rules are read from `lawful.toml` in the instance directory,
+falling back to the built-in defaults, so that they can be
+updated (and reloaded) without a deploy.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from contextlib import suppress
+from pathlib import Path
+
+import toml
+from attr import define, field
+from django.conf import settings
+
+from dougbot2.defaults import unpacking
+
+WHITELISTED_DOMAINS = (
+    "discord.com",
+    "discordapp.com",
+    "discord.gg",
+    "discord.gift",
+    "discord.gifts",
+    "dis.gd",
+    "discordstatus.com",
+    "discord.media",
+    "discordpy.readthedocs.io",
+    "discord.new",
+    "discordmerch.com",
+)
+
+SUSPICIOUS_PATTERNS = (r"d.?[i1l].?s+.?[ck].?[o0].?r.?(?:d|cl)",)
+
+
+class DomainSet:
+    """A set of domains that also matches their subdomains.
+
+    Domains are stored as tuples of labels in reverse order,
+    so a membership test looks up each suffix of the queried
+    domain once and is linear in the number of labels, regardless
+    of the size of the set.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        self.domains = tuple(domains)
+        self._suffixes = frozenset(self._labels(d) for d in self.domains)
+
+    @staticmethod
+    def _labels(domain: str) -> tuple[str, ...]:
+        return tuple(reversed(domain.lower().strip(".").split(".")))
+
+    def __contains__(self, domain: str) -> bool:
+        labels = self._labels(domain)
+        return any(labels[:i] in self._suffixes for i in range(1, len(labels) + 1))
+
+    def __iter__(self):
+        return iter(self.domains)
+
+    def __len__(self):
+        return len(self.domains)
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern:
+    """Combine patterns into a single case-insensitive regex.
+
+    An empty list of patterns matches nothing.
+    """
+    combined = "|".join(f"(?:{p})" for p in patterns) or "(?!)"
+    return re.compile(combined, re.IGNORECASE)
+
+
+@define
+class _Phishing:
+    whitelist: DomainSet = field(default=WHITELISTED_DOMAINS, converter=DomainSet)
+    patterns: re.Pattern = field(
+        default=SUSPICIOUS_PATTERNS,
+        converter=compile_patterns,
+    )
+
+
+@define
+class _Flood:
+    threshold: int = 3
+    window: float = 180
+    max_buckets: int = 4096
+
+
+@define
+class _Export:
+    max_slice_size: int = 50000
+    chunk_size: int = 500
+
+
+@define
+class _Bulk:
+    concurrency: int = 8
+
+
+@define
+class Rules:
+    phishing: _Phishing = field(factory=dict, converter=unpacking(_Phishing))
+    flood: _Flood = field(factory=dict, converter=unpacking(_Flood))
+    export: _Export = field(factory=dict, converter=unpacking(_Export))
+    bulk: _Bulk = field(factory=dict, converter=unpacking(_Bulk))
+
+
+def get_rules_path() -> Path:
+    return settings.INSTANCE_DIR / "lawful.toml"
+
+
+def load_rules() -> Rules:
+    """Load rules from `lawful.toml` in the instance directory.
+
+    Missing sections and keys use the built-in defaults.
+    """
+    data: dict = {}
+    with suppress(FileNotFoundError), open(get_rules_path()) as f:
+        data = toml.load(f)
+    return Rules(**data)
@@ -0,0 +1,251 @@
+# snapshots.py
+# Copyright (C) 2022  @tonyzbf +https://github.com/tonyzbf/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Incremental snapshots of guild channels and roles.
+
+Each channel and role is stored once per distinct state, addressed by
+the digest of its serialized form. A snapshot is a manifest mapping
+object IDs to digests, so taking a snapshot of a guild that has not
+changed only writes the manifest.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, Optional, Union
+
+import attr
+import simplejson as json
+from discord import (
+    CategoryChannel,
+    Guild,
+    Role,
+    StageChannel,
+    TextChannel,
+    VoiceChannel,
+)
+from django.conf import settings
+
+from dougbot2.utils.common import PermissionOverride, utcnow
+
+AnyChannel = Union[TextChannel, VoiceChannel, StageChannel, CategoryChannel]
+
+ObjectKind = Literal["channel", "role"]
+
+
+@attr.s(auto_attribs=True)
+class _Channel:
+    id: int
+    kind: str
+    name: str
+    desc: Optional[str]
+    cat: Optional[int]
+    perms: dict[int, tuple[int, int]]
+    order: int
+
+    @classmethod
+    def from_channel(cls, c: AnyChannel) -> _Channel:
+        perms = {}
+        for r, p in c.overwrites.items():
+            if not isinstance(r, Role):
+                continue
+            allowed, denied = PermissionOverride.upgrade(p).pair()
+            perms[r.id] = (allowed.value, denied.value)
+        return cls(
+            c.id,
+            type(c).__name__,
+            c.name,
+            getattr(c, "topic", None),
+            c.category_id,
+            perms,
+            c.position,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> _Channel:
+        perms = {int(k): tuple(v) for k, v in data["perms"].items()}
+        return cls(**{**data, "perms": perms})
+
+
+@attr.s(auto_attribs=True)
+class _Role:
+    id: int
+    name: int
+    color: int
+    perms: int
+    order: int
+    hoisted: bool
+    pingable: bool
+
+    @classmethod
+    def from_role(cls, r: Role) -> _Role:
+        return cls(
+            r.id,
+            r.name,
+            r.color.value,
+            r.permissions.value,
+            r.position,
+            r.hoist,
+            r.mentionable,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> _Role:
+        return cls(**data)
+
+
+Record = Union[_Channel, _Role]
+
+
+def serialize(record: Record) -> str:
+    return json.dumps(attr.asdict(record), sort_keys=True, separators=(",", ":"))
+
+
+def digest(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=20).hexdigest()
+
+
+def same_state(a: Record, b: Record) -> bool:
+    """Compare two records, ignoring their positions."""
+    return attr.evolve(a, order=0) == attr.evolve(b, order=0)
+
+
+def guild_records(guild: Guild) -> list[tuple[ObjectKind, Record]]:
+    return [
+        *(("channel", _Channel.from_channel(c)) for c in guild.channels),
+        *(("role", _Role.from_role(r)) for r in guild.roles),
+    ]
+
+
+@attr.s(auto_attribs=True)
+class Snapshot:
+    id: int
+    guild_id: int
+    created: datetime
+    channels: dict[int, _Channel] = attr.ib(factory=dict)
+    roles: dict[int, _Role] = attr.ib(factory=dict)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS object (
+    digest TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshot (id),
+    kind TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    digest TEXT NOT NULL REFERENCES object (digest),
+    PRIMARY KEY (snapshot_id, kind, object_id)
+);
+"""
+
+
+class SnapshotStore:
+    """SQLite-backed storage for guild snapshots.
+
+    Methods are blocking and open their own connection, so that they
+    can be run in a thread.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def save(
+        self, guild_id: int, records: list[tuple[ObjectKind, Record]]
+    ) -> tuple[int, int]:
+        """Store a snapshot.
+
+        Return the ID of the snapshot and the number of objects
+        that were not already stored.
+        """
+        objects = {}
+        manifest = []
+        for kind, record in records:
+            data = serialize(record)
+            key = digest(data)
+            objects[key] = data
+            manifest.append((kind, record.id, key))
+        with closing(self._connect()) as conn, conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO object (digest, data) VALUES (?, ?)",
+                objects.items(),
+            )
+            created = conn.total_changes - before
+            cursor = conn.execute(
+                "INSERT INTO snapshot (guild_id, created) VALUES (?, ?)",
+                (guild_id, utcnow().isoformat()),
+            )
+            snapshot_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO manifest (snapshot_id, kind, object_id, digest)"
+                " VALUES (?, ?, ?, ?)",
+                [(snapshot_id, *m) for m in manifest],
+            )
+        return snapshot_id, created
+
+    def load(self, guild_id: int, snapshot_id: int) -> Optional[Snapshot]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, guild_id, created FROM snapshot"
+                " WHERE id = ? AND guild_id = ?",
+                (snapshot_id, guild_id),
+            ).fetchone()
+            if not row:
+                return None
+            snapshot = Snapshot(row[0], row[1], datetime.fromisoformat(row[2]))
+            rows = conn.execute(
+                "SELECT manifest.kind, object.data FROM manifest"
+                " JOIN object ON object.digest = manifest.digest"
+                " WHERE manifest.snapshot_id = ?",
+                (snapshot_id,),
+            )
+            for kind, data in rows:
+                if kind == "channel":
+                    channel = _Channel.from_dict(json.loads(data))
+                    snapshot.channels[channel.id] = channel
+                else:
+                    role = _Role.from_dict(json.loads(data))
+                    snapshot.roles[role.id] = role
+        return snapshot
+
+    def history(self, guild_id: int, limit: int = 10) -> list[tuple[int, datetime]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, created FROM snapshot WHERE guild_id = ?"
+                " ORDER BY id DESC LIMIT ?",
+                (guild_id, limit),
+            ).fetchall()
+        return [(id_, datetime.fromisoformat(created)) for id_, created in rows]
+
+
+def get_snapshot_store() -> SnapshotStore:
+    return SnapshotStore(settings.INSTANCE_DIR / "lawful-snapshots.sqlite3")
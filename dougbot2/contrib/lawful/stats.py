@@ -0,0 +1,151 @@
+# stats.py
+# Copyright (C) 2022  @tonyzbf +https://github.com/tonyzbf/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import IO, Optional
+
+import pandas as pd
+
+COLUMNS = (
+    "author_id",
+    "author",
+    "timestamp",
+    "length",
+    "has_uploads",
+    "link",
+    "subscriber",
+    "booster",
+)
+
+Chunk = dict[str, list]
+
+
+class _AuthorStats:
+    __slots__ = ("num_messages", "num_chars", "hours", "days", "subscriber", "booster")
+
+    def __init__(self, subscriber: bool, booster: bool):
+        self.num_messages = 0
+        self.num_chars = 0
+        self.hours: set[int] = set()
+        self.days: set[int] = set()
+        self.subscriber = subscriber
+        self.booster = booster
+
+
+class MessageStats:
+    """Per-author activity statistics accumulated in fixed-size chunks.
+
+    Rows are collected into columns on the event loop. Full chunks are
+    then passed to `consume`, which is meant to be run in a thread: it
+    appends the chunk to a CSV stream and folds it into the per-author
+    aggregates, so that memory use depends on the number of authors
+    rather than the number of messages.
+    """
+
+    def __init__(self, stream: IO[bytes], chunk_size: int = 1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.authors: dict[str, _AuthorStats] = {}
+        self._columns: Chunk = self._empty()
+
+    @staticmethod
+    def _empty() -> Chunk:
+        return {c: [] for c in COLUMNS}
+
+    def append(
+        self,
+        author_id: int,
+        author: str,
+        timestamp: datetime,
+        length: int,
+        has_uploads: bool,
+        link: str,
+        subscriber: bool,
+        booster: bool,
+    ) -> Optional[Chunk]:
+        """Add a row and return the current chunk if it is full."""
+        row = (
+            author_id,
+            author,
+            timestamp,
+            length,
+            has_uploads,
+            link,
+            subscriber,
+            booster,
+        )
+        for column, value in zip(self._columns.values(), row):
+            column.append(value)
+        if len(self._columns["author_id"]) >= self.chunk_size:
+            return self.take()
+        return None
+
+    def take(self) -> Chunk:
+        """Detach and return the current chunk."""
+        chunk, self._columns = self._columns, self._empty()
+        return chunk
+
+    def consume(self, chunk: Chunk):
+        """Write a chunk to the CSV stream and update the aggregates."""
+        size = len(chunk["author_id"])
+        df = pd.DataFrame(chunk, index=range(self.rows, self.rows + size))
+        self.stream.write(df.to_csv(header=not self.rows).encode())
+        self.rows += size
+        for author, timestamp, length, subscriber, booster in zip(
+            chunk["author"],
+            chunk["timestamp"],
+            chunk["length"],
+            chunk["subscriber"],
+            chunk["booster"],
+        ):
+            if not (stats := self.authors.get(author)):
+                stats = self.authors[author] = _AuthorStats(subscriber, booster)
+            epoch = int(timestamp.timestamp())
+            stats.num_messages += 1
+            stats.num_chars += length
+            stats.hours.add(epoch // 3600)
+            stats.days.add(epoch // 86400)
+
+    def summarize(self) -> bytes:
+        """Return the per-author summary as CSV."""
+        summaries = pd.DataFrame.from_records(
+            [
+                (
+                    author,
+                    stats.num_messages,
+                    stats.num_chars,
+                    len(stats.hours),
+                    len(stats.days),
+                    "yes" if stats.subscriber else "no",
+                    "yes" if stats.booster else "no",
+                )
+                for author, stats in self.authors.items()
+            ],
+            columns=[
+                "author",
+                "num_messages",
+                "num_chars",
+                "active_hours",
+                "active_days",
+                "subscriber",
+                "booster",
+            ],
+            index="author",
+        ).sort_values("num_messages", ascending=False, kind="stable")
+        return summaries.to_csv().encode()
@@ -364,6 +364,7 @@ class StoryCollector:
 
         stat = (
             Embed2(title="📊 Statistics", description=description)
+            .builder()
             .set_timestamp()
             .add_field(name="Messages", value=len(self.messages))
             .add_field(name="Words", value=len(tokens))
@@ -372,14 +373,14 @@ class StoryCollector:
             .decorated(self.ctx.guild)
         )
         for contrib in chapterize(contributors, 960):
-            stat = stat.add_field(name="Contributors", value=contrib, inline=False)
-        stat = stat.add_field(
+            stat.add_field(name="Contributors", value=contrib, inline=False)
+        stat.add_field(
             name="Top 5 contributors by messages",
             value=top_5_authors_msgs,
             inline=False,
         )
         if most_common_words:
-            stat = stat.add_field(
+            stat.add_field(
                 name="Most frequent terms", value=most_common_words, inline=False
             )
-        return stat
+        return stat.build()
@@ -14,14 +14,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections.abc import Iterable
 from dataclasses import dataclass
+from datetime import tzinfo
 from textwrap import dedent
-from typing import Optional, Union
+from typing import Optional, TypeVar, Union
 from zoneinfo import ZoneInfo
 
 import arrow
 import emoji
 from discord import Member, Role
+from discord.ext.commands import Greedy
 from geopy import Location
 from geopy.exc import GeocoderTimedOut
 
@@ -45,6 +48,7 @@ from dougbot2.utils.common import (
     can_embed,
     code,
     pointer,
+    shorten_list,
     tag,
     tag_literal,
     verbatim,
@@ -54,6 +58,9 @@ from dougbot2.utils.datetime import get_tzfinder
 from dougbot2.utils.dm import accept_dms
 
 from .models import DateTimeSettings, RoleTimezone
+from .preferences import get_default_dateformat, get_preferences, get_preferences_many
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -86,6 +93,29 @@ def _get_clock_emoji(time: arrow.Arrow) -> str:
     return emoji.emojize(f":{hh}{mm}:")
 
 
+def _at_timezones(
+    items: Iterable[tuple[tzinfo, T]]
+) -> list[tuple[arrow.Arrow, list[T]]]:
+    """Group items by timezone and get the current time once for each zone."""
+    groups: dict[str, tuple[tzinfo, list[T]]] = {}
+    for tz, item in items:
+        groups.setdefault(str(tz), (tz, []))[1].append(item)
+    now = arrow.now()
+    return [
+        (arrow.Arrow.fromdatetime(now.astimezone(tz)), grouped)
+        for tz, grouped in groups.values()
+    ]
+
+
+def _first_role_timezone(
+    roles: list[Role], role_tzs: dict[int, tzinfo]
+) -> Optional[_TimezoneOrigin]:
+    for r in roles:
+        if r.id in role_tzs:
+            return _TimezoneOrigin(role_tzs[r.id], r)
+    return None
+
+
 class TimeandDate(
     Gear,
     name="Time and date",
@@ -102,9 +132,7 @@ class TimeandDate(
         return role_tz
 
     async def get_formatting(self, member: Member) -> str:
-        if settings := await DateTimeSettings.first(member):
-            return settings.formatting
-        return self._get_default_dateformat()
+        return (await get_preferences(member.id)).formatting
 
     def format_datetime(self, dt: arrow.Arrow, fmt: str):
         if fmt[:9] == "strftime:":
@@ -133,18 +161,44 @@ class TimeandDate(
     async def get_timezone_by_roles(
         self, roles: list[Role]
     ) -> Optional[_TimezoneOrigin]:
-        rolemap = {r.id: r for r in roles}
-        q = RoleTimezone.objects.filter(snowflake__in=rolemap)
-        tz: Optional[RoleTimezone] = await async_first(q)
-        if not tz:
-            return None
-        return _TimezoneOrigin(tz.timezone, rolemap[tz.snowflake])
+        """Find the timezone of the first role in `roles` that has one."""
+        q = RoleTimezone.objects.filter(snowflake__in=[r.id for r in roles])
+        role_tzs = {r.snowflake: r.timezone for r in await async_list(q)}
+        return _first_role_timezone(roles, role_tzs)
 
     async def get_timezone_by_user(self, member: Member) -> Optional[_TimezoneOrigin]:
-        settings = await DateTimeSettings.first(member)
-        if not settings or not settings.timezone:
+        prefs = await get_preferences(member.id)
+        if not prefs.timezone:
             return await self.get_timezone_by_roles([*reversed(member.roles)])
-        return _TimezoneOrigin(settings.timezone, member)
+        return _TimezoneOrigin(prefs.timezone, member)
+
+    async def get_timezones_by_users(
+        self, members: list[Member]
+    ) -> dict[int, _TimezoneOrigin]:
+        """Find the timezones of many members at once.
+
+        Same as calling `get_timezone_by_user` for each member, but with
+        at most one query for user preferences and one query for role
+        timezones. Members without a timezone of their own use the
+        timezone of their highest role that has one.
+        """
+        prefs = await get_preferences_many(m.id for m in members)
+        origins: dict[int, _TimezoneOrigin] = {}
+        pending: list[Member] = []
+        for m in members:
+            if tz := prefs[m.id].timezone:
+                origins[m.id] = _TimezoneOrigin(tz, m)
+            else:
+                pending.append(m)
+        role_ids = {r.id for m in pending for r in m.roles}
+        if not role_ids:
+            return origins
+        q = RoleTimezone.objects.filter(pk__in=role_ids)
+        role_tzs = {r.snowflake: r.timezone for r in await async_list(q)}
+        for m in pending:
+            if origin := _first_role_timezone([*reversed(m.roles)], role_tzs):
+                origins[m.id] = origin
+        return origins
 
     @command("time")
     @doc.description("Get the local time of a server member or a timezone.")
@@ -201,6 +255,43 @@ class TimeandDate(
 
         await ctx.respond(embed=result).run()
 
+    @command("times")
+    @doc.description("List the local times of several members.")
+    @doc.argument("subjects", "The members, or roles whose members, to list.")
+    @doc.invocation(("subjects",), None)
+    @can_embed
+    async def times(self, ctx: Surroundings, subjects: Greedy[Union[Member, Role]]):
+        members: dict[int, Member] = {}
+        for subject in subjects:
+            if isinstance(subject, Role):
+                members.update({m.id: m for m in subject.members})
+            else:
+                members[subject.id] = subject
+        if not members:
+            raise NotAcceptable("No members to list.")
+
+        origins = await self.get_timezones_by_users([*members.values()])
+        times = sorted(
+            _at_timezones((o.timezone, members[k]) for k, o in origins.items()),
+            key=lambda t: t[0].naive,
+        )
+        lines = [
+            (
+                f"{_get_clock_emoji(t)}"
+                f' {code(t.format("HH:mm"))} {t.tzinfo} ({t.format("ZZ")}):'
+                f" {' '.join(shorten_list([m.mention for m in grouped], 30))}"
+            )
+            for t, grouped in times
+        ]
+        if unknown := [m.mention for k, m in members.items() if k not in origins]:
+            lines.append(f"No timezone info: {' '.join(shorten_list(unknown, 30))}")
+        pages = EmbedPagination.from_lines(
+            lines, "Local times", init=lambda c: c.decorated(ctx.guild)
+        )
+        await ctx.respond(embed=pages).responder(
+            pages.with_context(ctx)
+        ).deleter().run()
+
     @topic("timezone")
     @doc.description("Show your timezone preference (if you had set one).")
     @doc.hidden
@@ -211,15 +302,16 @@ class TimeandDate(
             return await ctx.call(self.timezone_set, timezone=extras)
 
         embed = Embed2(title="Timezone").personalized(ctx.author)
-        settings = await DateTimeSettings.first(ctx.author)
-        if not settings or not settings.timezone:
+        prefs = await get_preferences(ctx.author.id)
+        if not prefs.timezone:
             embed = embed.set_description("No timezone preference set.").set_footer(
                 text=f'Set your timezone using the command "{ctx.prefix}timezone set [location]"'
             )
         else:
-            formatting = await self.get_formatting(ctx.author)
-            timestr = self.format_datetime(arrow.now(tz=settings.timezone), formatting)
-            embed = embed.set_description(code(settings.timezone)).add_field(
+            timestr = self.format_datetime(
+                arrow.now(tz=prefs.timezone), prefs.formatting
+            )
+            embed = embed.set_description(code(prefs.timezone)).add_field(
                 name="Local time", value=timestr
             )
         await ctx.respond(embed=embed).reply().run()
@@ -326,7 +418,7 @@ class TimeandDate(
         await self.reply_set_timezone(ctx, settings, result.location)
 
     def _get_default_dateformat(self) -> str:
-        return DateTimeSettings._meta.get_field("formatting").default
+        return get_default_dateformat()
 
     def _print_date_format(self, formatting: str) -> Embed2:
         formatted = self.format_datetime(arrow.now(), formatting)
@@ -347,10 +439,8 @@ class TimeandDate(
         if extras:
             return await ctx.call(self.date_format_set, specifier=extras)
 
-        default_format = self._get_default_dateformat()
-        settings = await DateTimeSettings.first(ctx.author)
-        formatting = settings.formatting if settings else default_format
-        res = self._print_date_format(formatting)
+        prefs = await get_preferences(ctx.author.id)
+        res = self._print_date_format(prefs.formatting)
         return await ctx.respond(embed=res).deleter().run()
 
     @date_format.command("help")
@@ -413,8 +503,11 @@ class TimeandDate(
     def _print_role_timezones(
         self, *tzs: RoleTimezone, sort_offset: bool = True
     ) -> list[str]:
-        now = arrow.now()
-        times = [(arrow.Arrow.fromdatetime(now.astimezone(r.timezone)), r) for r in tzs]
+        times = [
+            (t, r)
+            for t, grouped in _at_timezones((r.timezone, r) for r in tzs)
+            for r in grouped
+        ]
         if sort_offset:
             times = sorted(times, key=lambda t: t[0].naive)
         return [
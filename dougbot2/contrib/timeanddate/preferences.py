@@ -0,0 +1,129 @@
+# preferences.py
+# Copyright (C) 2022  @tonyzbf +https://github.com/tonyzbf/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import tzinfo
+from typing import Optional
+
+from django.db.models.signals import post_delete, post_save
+
+from dougbot2.utils.async_ import async_first, async_list
+
+from .models import DateTimeSettings
+
+
+@dataclass(frozen=True)
+class UserPreferences:
+    """A user's date/time preferences, or the defaults if they have none."""
+
+    timezone: Optional[tzinfo]
+    formatting: str
+
+    @classmethod
+    def from_settings(cls, settings: Optional[DateTimeSettings]) -> UserPreferences:
+        if not settings:
+            return cls(None, get_default_dateformat())
+        return cls(settings.timezone or None, settings.formatting)
+
+
+def get_default_dateformat() -> str:
+    return DateTimeSettings._meta.get_field("formatting").default
+
+
+class PreferenceCache:
+    """LRU cache of user preferences, keyed by user ID.
+
+    Entries are invalidated when the corresponding `DateTimeSettings`
+    is saved or deleted (signals may be sent from the thread
+    running the query). Invalidation also bumps a version number so
+    that a lookup that was in flight when the row changed doesn't
+    put a stale value back into the cache.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.version = 0
+        self._entries: OrderedDict[int, UserPreferences] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[UserPreferences]:
+        try:
+            self._entries.move_to_end(user_id)
+            return self._entries[user_id]
+        except KeyError:
+            return None
+
+    def put(self, user_id: int, prefs: UserPreferences, version: int):
+        if version != self.version:
+            return
+        self._entries[user_id] = prefs
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self.version += 1
+        self._entries.pop(user_id, None)
+
+
+preference_cache = PreferenceCache()
+
+
+def _settings_changed(sender, instance: DateTimeSettings, **kwargs):
+    preference_cache.invalidate(instance.snowflake)
+
+
+post_save.connect(
+    _settings_changed, sender=DateTimeSettings, dispatch_uid=f"{__name__}.saved"
+)
+post_delete.connect(
+    _settings_changed, sender=DateTimeSettings, dispatch_uid=f"{__name__}.deleted"
+)
+
+
+async def get_preferences(user_id: int) -> UserPreferences:
+    """Get the timezone and date format of a user with at most one query."""
+    if prefs := preference_cache.get(user_id):
+        return prefs
+    version = preference_cache.version
+    q = DateTimeSettings.objects.filter(snowflake__exact=user_id)
+    prefs = UserPreferences.from_settings(await async_first(q))
+    preference_cache.put(user_id, prefs, version)
+    return prefs
+
+
+async def get_preferences_many(user_ids: Iterable[int]) -> dict[int, UserPreferences]:
+    """Get the preferences of many users with at most one query."""
+    results: dict[int, UserPreferences] = {}
+    missing: list[int] = []
+    for user_id in user_ids:
+        if prefs := preference_cache.get(user_id):
+            results[user_id] = prefs
+        else:
+            missing.append(user_id)
+    if not missing:
+        return results
+    version = preference_cache.version
+    q = DateTimeSettings.objects.filter(pk__in=missing)
+    found = {settings.snowflake: settings for settings in await async_list(q)}
+    for user_id in missing:
+        prefs = UserPreferences.from_settings(found.get(user_id))
+        preference_cache.put(user_id, prefs, version)
+        results[user_id] = prefs
+    return results
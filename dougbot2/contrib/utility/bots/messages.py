@@ -331,7 +331,7 @@ class MessageCommands:
         try:
             await ctx.trigger_typing()
             tmpl = env.from_string(template.result)
-            txt = await tmpl.render_timed(ctx, **variables)
+            txt = await tmpl.render_isolated(ctx, **variables)
             return await ctx.send(txt)
         except Exception as e:
             embed = ctx.bot.console.pprint_exception(e)
@@ -39,6 +39,7 @@ from dougbot2.utils.common import (
     Embed2,
     EmbedField,
     EmbedPagination,
+    LazySequence,
     PermissionOverride,
     Permissions2,
     can_embed,
@@ -218,10 +219,11 @@ class ServerQueryCommands:
             name = category_name(category)
             lines = [f"{code(ch.position)} {tag(ch)}" for ch in channels]
             fields.append(EmbedField(name=name, value="\n".join(lines), inline=True))
-        pages: list[Embed2] = []
         base_embed = Embed2(title="Channels").decorated(ctx.guild)
-        for fieldset in chapterize_fields(fields):
-            pages.append(attr.evolve(base_embed, fields=fieldset))
+        pages = LazySequence.map(
+            lambda fieldset: attr.evolve(base_embed, fields=fieldset),
+            [*chapterize_fields(fields)],
+        )
         pagination = EmbedPagination(pages, "Channels", False)
         await ctx.respond(embed=pagination).responder(
             pagination.with_context(ctx)
@@ -267,8 +269,10 @@ class ServerQueryCommands:
 
         lines = [getline(r) for r in roles]
         body = "\n".join(lines)
-        sections = chapterize(body, 720, lambda c: c == "\n")
-        pages = [Embed2(description=c).decorated(ctx.guild) for c in sections]
+        sections = [*chapterize(body, 720, lambda c: c == "\n")]
+        pages = LazySequence.map(
+            lambda c: Embed2(description=c).decorated(ctx.guild), sections
+        )
         pagination = EmbedPagination(pages, "Roles", False)
         await ctx.respond(embed=pagination).responder(
             pagination.with_context(ctx)
@@ -38,6 +38,7 @@ class Circumstances(Context, _Surroundings):
         super().__init__(**attrs)
         self.timestamp = self.message.created_at.replace(tzinfo=timezone.utc)
         self.styles = get_defaults().styles
+        self._parsed_names: Optional[tuple[tuple, str, str]] = None
 
     async def init(self):
         from ..models import Server
@@ -90,23 +91,36 @@ class Circumstances(Context, _Surroundings):
         else:
             self._invoked_subcommand = cmd
 
-    @property
-    def full_invoked_with(self) -> str:
-        """The fully-qualified sequence of command names that has been parsed."""
-        return " ".join(
+    def _get_parsed_names(self) -> tuple[str, str]:
+        # Error handlers and loggers read these repeatedly per invocation,
+        # so they are computed once and recomputed only after the view
+        # has advanced (i.e. more subcommands were parsed).
+        state = (self.view.index, self.prefix, self.invoked_with)
+        memo = self._parsed_names
+        if memo is not None and memo[0] == state:
+            return memo[1], memo[2]
+        full_invoked_with = " ".join(
             {
                 **{k: True for k in self.invoked_parents},
                 self.invoked_with: True,
             }.keys()
         )
+        msg: str = self.view.buffer
+        raw_input = (
+            msg.removeprefix(self.prefix).strip()[len(full_invoked_with) :].strip()
+        )
+        self._parsed_names = (state, full_invoked_with, raw_input)
+        return full_invoked_with, raw_input
+
+    @property
+    def full_invoked_with(self) -> str:
+        """The fully-qualified sequence of command names that has been parsed."""
+        return self._get_parsed_names()[0]
 
     @property
     def raw_input(self) -> str:
         """The rest of the message content after all parsed commands."""
-        msg: str = self.view.buffer
-        return (
-            msg.removeprefix(self.prefix).strip()[len(self.full_invoked_with) :].strip()
-        )
+        return self._get_parsed_names()[1]
 
     @property
     def is_direct_message(self):
@@ -45,7 +45,7 @@ from ...blueprints import (
     _Type,
     _TypePrinter,
 )
-from ...utils.datastructures import TypeDictionary
+from ...utils.datastructures import LazySequence, TypeDictionary
 from ...utils.duckcord.color import Color2
 from ...utils.duckcord.embeds import Embed2, EmbedField
 from ...utils.english import QuantifiedNP, singularize, slugify
@@ -698,13 +698,16 @@ class CommandDoc(Documentation):
             for f in self.export["fields"]
             if f["value"]
         ]
-        chapters = chapterize_fields(sections, maxlen, linebreak=lambda c: c == "\x00")
-        embeds = [
-            Embed2(fields=[c.replace("\x00", "\n") for c in chapter])
-            for chapter in chapters
+        chapters = [
+            *chapterize_fields(sections, maxlen, linebreak=lambda c: c == "\x00")
         ]
+        embeds = LazySequence.map(
+            lambda chapter: Embed2(
+                fields=[c.replace("\x00", "\n") for c in chapter]
+            ).set_description(self.description),
+            chapters,
+        )
         title = f"Help: {self.call_sign}"
-        embeds = [e.set_description(self.description) for e in embeds]
         return EmbedPagination(embeds, title, False)
 
 
@@ -887,10 +890,11 @@ class Manual(Manpage):
 
     def to_embed(self, maxlen: int = 500) -> EmbedPagination:
         fields = [EmbedField(**f) for f in self._export["fields"]]
-        chapters = chapterize_items(fields, maxlen)
-        embeds = [Embed2(fields=chapter, color=Color2.blue()) for chapter in chapters]
-        embeds = [
-            e.set_footer(text=('Use "help [command]" here to see how to use a command'))
-            for e in embeds
-        ]
+        chapters = [*chapterize_items(fields, maxlen)]
+        embeds = LazySequence.map(
+            lambda chapter: Embed2(fields=chapter, color=Color2.blue()).set_footer(
+                text=('Use "help [command]" here to see how to use a command')
+            ),
+            chapters,
+        )
         return EmbedPagination(embeds, "Help", True)
@@ -23,11 +23,11 @@ from .checks import (
     can_react,
     can_upload,
 )
-from .datastructures import BigIntDict
+from .datastructures import BigIntDict, LazySequence
 from .datetime import assumed_utc, strpduration, utcnow, utctimestamp
 from .dm import accept_dms
 from .duckcord.color import Color2
-from .duckcord.embeds import Embed2, EmbedField
+from .duckcord.embeds import Embed2, Embed2Builder, EmbedField
 from .duckcord.permissions import PermissionOverride, Permissions2, get_total_perms
 from .events import (
     DeleteResponder,
@@ -39,6 +39,7 @@ from .events import (
     event_filter,
     run_responders,
     start_responders,
+    stop_responders,
 )
 from .markdown import (
     E,
@@ -72,6 +73,7 @@ from .pagination import (
     chapterize,
     chapterize_fields,
     chapterize_items,
+    shorten_list,
     trunc_for_field,
 )
 from .response import ResponseInit
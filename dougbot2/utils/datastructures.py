@@ -20,13 +20,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from collections.abc import MutableMapping
+from collections.abc import Callable, Iterable, Iterator, MutableMapping, Sequence
+from itertools import islice
 from typing import Optional, TypeVar, Union, get_args, get_origin
 
 MAX_SAFE_INTEGER = 2**53
 
 _KT = TypeVar("_KT")
 _VT = TypeVar("_VT")
+_T = TypeVar("_T")
+_U = TypeVar("_U")
 
 
 class BigIntDict(MutableMapping[_KT, _VT]):
@@ -116,3 +119,91 @@ class TypeDictionary(MutableMapping[_KT, _VT]):
 
     def __len__(self):
         return len(self._dict)
+
+
+class LazySequence(Sequence[_T]):
+    """A sequence backed by an iterator, producing items only when they are accessed.
+
+    Items that have been produced are cached, so each item is produced at most once.
+
+    If `length` is not given (and the iterable is not sized), the length is unknown
+    until the iterator is exhausted; in that case `len()` and negative indices
+    consume the entire iterator.
+    """
+
+    def __init__(self, items: Iterable[_T], length: Optional[int] = None) -> None:
+        if length is None:
+            length = self.length_hint(items)
+        self._cache: list[_T] = []
+        self._iter: Optional[Iterator[_T]] = iter(items)
+        self._length = length
+
+    @classmethod
+    def map(cls, func: Callable[[_U], _T], items: Iterable[_U]) -> "LazySequence[_T]":
+        """Lazily apply `func` to each item, preserving the length of `items` if known."""
+        return cls(map(func, items), cls.length_hint(items))
+
+    @staticmethod
+    def length_hint(items: Iterable) -> Optional[int]:
+        """Return the length of `items` if it is known without consuming it."""
+        if isinstance(items, LazySequence):
+            return items._length
+        if hasattr(items, "__len__"):
+            return len(items)
+        return None
+
+    def _fill(self, k: Optional[int] = None) -> None:
+        if self._iter is None:
+            return
+        cache = self._cache
+        if k is None:
+            cache.extend(self._iter)
+        elif k >= len(cache):
+            cache.extend(islice(self._iter, k - len(cache) + 1))
+            if k < len(cache):
+                return
+        else:
+            return
+        self._iter = None
+        self._length = len(cache)
+
+    def __getitem__(self, k: Union[int, slice]):
+        if isinstance(k, slice):
+            start, stop = k.start, k.stop
+            if any(i is not None and i < 0 for i in (start, stop)) or stop is None:
+                self._fill()
+            else:
+                self._fill(max(start or 0, stop) - 1)
+            return self._cache[k]
+        if k < 0 and self._length is not None:
+            k += self._length
+            if k < 0:
+                raise IndexError("index out of range")
+        if k < 0:
+            self._fill()
+        else:
+            self._fill(k)
+        return self._cache[k]
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._fill()
+        return self._length
+
+    def __iter__(self) -> Iterator[_T]:
+        idx = 0
+        while True:
+            try:
+                yield self[idx]
+            except IndexError:
+                return
+            idx += 1
+
+    def has_index(self, k: int) -> bool:
+        """Whether item `k` exists, producing items only up to `k`."""
+        if k < 0:
+            return -k <= len(self)
+        if self._length is not None:
+            return k < self._length
+        self._fill(k)
+        return k < len(self._cache)
@@ -21,12 +21,13 @@
 # SOFTWARE.
 
 from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from discord.ext.commands import Context
 from jinja2 import StrictUndefined
 
-from .models import Member, Message
+from .models import Member, MemberData, Message, MessageData
 from .namespace import AttributeMapping, NamespaceRecord
 
 ctx: ContextVar[Context] = ContextVar("ctx")
@@ -90,3 +91,18 @@ def set_context(context: Context):
 
 def get_context() -> Context:
     return ctx.get()
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """Picklable stand-in for a command context, with only what templates can read."""
+
+    author: MemberData
+    message: MessageData
+
+
+def snapshot_context(context: Context) -> ContextSnapshot:
+    return ContextSnapshot(
+        author=MemberData.from_discord(context.author),
+        message=MessageData.from_discord(context.message),
+    )
@@ -22,7 +22,9 @@
 
 from __future__ import annotations
 
+import weakref
 from collections.abc import Callable
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, TypeVar
 
@@ -30,6 +32,7 @@ from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
 from jinja2 import (
     BaseLoader,
     Environment,
@@ -44,6 +47,31 @@ from .models import BaseTemplate
 
 T = TypeVar("T", bound=BaseTemplate)
 
+TemplateKey = tuple[str, str, str]
+
+# Last known version of each loaded template, kept current by model signals,
+# so that checking whether a cached template is up to date needs no query.
+_versions: dict[TemplateKey, datetime] = {}
+
+
+def _get_key(instance: BaseTemplate) -> TemplateKey:
+    meta = instance._meta
+    return meta.app_label, meta.model_name, str(instance.pk)
+
+
+def _template_saved(sender, instance, **kwargs):
+    if isinstance(instance, BaseTemplate):
+        _versions[_get_key(instance)] = instance.updated
+
+
+def _template_deleted(sender, instance, **kwargs):
+    if isinstance(instance, BaseTemplate):
+        _versions.pop(_get_key(instance), None)
+
+
+post_save.connect(_template_saved, dispatch_uid=f"{__name__}.saved")
+post_delete.connect(_template_deleted, dispatch_uid=f"{__name__}.deleted")
+
 
 class ModelLoader(BaseLoader):
     def get_instance(self, template: str) -> T:
@@ -51,7 +79,9 @@ class ModelLoader(BaseLoader):
         app_label = path.parts[0]
         model_name = path.parts[1]
         model: type[T] = apps.get_model(app_label, model_name)
-        return model.objects.get(id=path.with_suffix("").name)
+        return model.objects.only("source", "updated").get(
+            id=path.with_suffix("").name
+        )
 
     def get_source(
         self,
@@ -62,18 +92,46 @@ class ModelLoader(BaseLoader):
             tmpl = self.get_instance(template)
         except (ObjectDoesNotExist, LookupError) as e:
             raise TemplateNotFound(template, str(e))
-        return tmpl.source, template, lambda: True
+        key = _get_key(tmpl)
+        version = _versions[key] = tmpl.updated
+
+        def uptodate() -> bool:
+            return _versions.get(key) == version
+
+        return tmpl.source, template, uptodate
 
 
 class DjangoEnvironment(CommandEnvironment):
-    @sync_to_async
-    def get_template_async(
+    def get_cached_template(self, name: str, globals=None) -> Optional[Template]:
+        """Return the template from the environment's cache if it is up to date.
+
+        Does not access the database.
+        """
+        if self.cache is None:
+            return None
+        template = self.cache.get((weakref.ref(self.loader), name))
+        if template is None:
+            return None
+        if self.auto_reload and not template.is_up_to_date:
+            return None
+        if globals:
+            template.globals.update(globals)
+        return template
+
+    async def get_template_async(
         self,
         name: str | Template,
         parent=None,
         globals=None,
     ) -> Template:
-        return self.get_template(name, parent, globals)
+        if isinstance(name, Template):
+            return name
+        if parent is not None:
+            name = self.join_path(name, parent)
+        template = self.get_cached_template(name, globals)
+        if template is not None:
+            return template
+        return await sync_to_async(self.get_template)(name, None, globals)
 
 
 def make_environment():
@@ -20,6 +20,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from datetime import datetime
+
 from django.db import models
 
 
@@ -28,6 +30,7 @@ class BaseTemplate(models.Model):
         abstract = True
 
     source: str = models.TextField(blank=True)
+    updated: datetime = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         meta = self._meta
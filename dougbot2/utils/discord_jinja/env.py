@@ -21,11 +21,19 @@
 # SOFTWARE.
 
 import asyncio
-from typing import Any, Mapping, Optional, Type, TypeVar, Union
+import inspect
+import re
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from hashlib import blake2b
+from typing import Any, Callable, Iterable, Mapping, Optional, Type, TypeVar, Union
 
-from jinja2 import StrictUndefined, Template, select_autoescape
+from jinja2 import StrictUndefined, Template, nodes, select_autoescape
+from jinja2.compiler import CodeGenerator, Frame
+from jinja2.exceptions import SecurityError
 from jinja2.runtime import Context
-from jinja2.sandbox import SandboxedEnvironment
+from jinja2.sandbox import SandboxedEnvironment, safe_range
 from jinja2.utils import missing
 
 from .contexts import TemplateContext, set_context
@@ -33,6 +41,135 @@ from .filters import register_filters
 
 default_env = None
 
+# Remaining number of sandboxed operations allowed for the render
+# running in the current task, if limited.
+_operation_budget: ContextVar[Optional[list[int]]] = ContextVar(
+    "_operation_budget", default=None
+)
+
+
+class TemplateLimitExceeded(SecurityError):
+    """Raised when rendering a template exceeds the environment's resource limits."""
+
+
+class BudgetedRange:
+    """A `range` whose iteration counts against the render's operation budget.
+
+    `for` loops are already counted, but filters such as `list` or `sum`
+    iterate without going through any sandbox hook.
+    """
+
+    def __init__(self, env: "CommandEnvironment", *args: int) -> None:
+        self._env = env
+        self._range = safe_range(*args)
+
+    def __iter__(self):
+        consume = self._env.consume_operation
+        for i in self._range:
+            consume()
+            yield i
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, k):
+        return self._range[k]
+
+    def __contains__(self, item) -> bool:
+        return item in self._range
+
+    def __repr__(self) -> str:
+        return repr(self._range)
+
+
+class CommandCodeGenerator(CodeGenerator):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # IDs of the iterables of the `for` loops in the template
+        self._loop_iters: set[int] = set()
+
+    def visit(self, node: nodes.Node, *args, **kwargs):
+        if id(node) not in self._loop_iters:
+            return super().visit(node, *args, **kwargs)
+        self.write("environment.budgeted_iter(")
+        super().visit(node, *args, **kwargs)
+        self.write(")")
+
+    def visit_For(self, node: nodes.For, frame: Frame):
+        self._loop_iters.add(id(node.iter))
+        super().visit_For(node, frame)
+
+    def visit_Concat(self, node: nodes.Concat, frame: Frame):
+        # `~` doesn't go through call_binop, so check its result instead.
+        self.write("environment.checked_concat(")
+        super().visit_Concat(node, frame)
+        self.write(")")
+
+
+# Upper bounds (or close estimates) of the output size of builtin filters
+# that can produce strings much larger than their input.
+# They take the same arguments as the filters.
+
+
+def _replace_size(eval_ctx, s, old, new, count=None) -> int:
+    s, old, new = str(s), str(old), str(new)
+    n = s.count(old) if old else len(s) + 1
+    if count is not None and count >= 0:
+        n = min(n, count)
+    return len(s) + n * max(len(new) - len(old), 0)
+
+
+def _join_size(eval_ctx, value, d="", attribute=None) -> int:
+    try:
+        return max(len(value) - 1, 0) * len(str(d))
+    except TypeError:
+        return 0
+
+
+def _center_size(value, width=80) -> int:
+    return max(len(str(value)), width)
+
+
+RE_FORMAT_WIDTH = re.compile(r"%[-#0 +]*(\d*|\*)(?:\.(\d*|\*))?")
+
+
+def _format_size(value, *args, **kwargs) -> int:
+    value = str(value)
+    size = len(value) + sum(len(str(v)) for v in (*args, *kwargs.values()))
+    for width, precision in RE_FORMAT_WIDTH.findall(value):
+        for n in (width, precision):
+            if n == "*":
+                size += max((abs(v) for v in args if isinstance(v, int)), default=0)
+            elif n:
+                size += int(n)
+    return size
+
+
+def _indent_size(s, width=4, first=False, blank=False) -> int:
+    s = str(s)
+    if isinstance(width, str):
+        width = len(width)
+    return len(s) + (s.count("\n") + 1) * width
+
+
+def _wordwrap_size(
+    environment, s, width=79, break_long_words=True, wrapstring=None, **kwargs
+) -> int:
+    s = str(s)
+    if wrapstring is None:
+        wrapstring = environment.newline_sequence
+    return len(s) + (len(s) // max(width, 1) + 1) * len(wrapstring)
+
+
+SIZED_FILTERS: dict[str, Callable[..., int]] = {
+    "replace": _replace_size,
+    "join": _join_size,
+    "center": _center_size,
+    "format": _format_size,
+    "indent": _indent_size,
+    "wordwrap": _wordwrap_size,
+}
+
 
 class CommandContext(Context):
     def __init__(self, *args, **kwargs):
@@ -63,7 +200,30 @@ class CommandTemplate(Template):
 
     async def render(self, ctx: Optional[Context], **variables) -> str:
         set_context(ctx)
-        return await super().render_async(**variables)
+        env: CommandEnvironment = self.environment
+        max_output = getattr(env, "max_output_size", None)
+        max_operations = getattr(env, "max_operations", None)
+        if max_output is None and max_operations is None:
+            return await super().render_async(**variables)
+
+        # Stream the output so that the size limit is enforced as the template
+        # renders, instead of after it has produced the whole string.
+        budget = _operation_budget.set(
+            [max_operations] if max_operations is not None else None
+        )
+        try:
+            chunks = []
+            size = 0
+            async for chunk in self.generate_async(**variables):
+                size += len(chunk)
+                if max_output is not None and size > max_output:
+                    raise TemplateLimitExceeded(
+                        f"Template output exceeded {max_output} characters."
+                    )
+                chunks.append(chunk)
+            return "".join(chunks)
+        finally:
+            _operation_budget.reset(budget)
 
     async def render_timed(
         self, ctx: Optional[Context], timeout: float = 10.0, **variables
@@ -72,10 +232,184 @@ class CommandTemplate(Template):
         result = await asyncio.wait_for(renderer, timeout=timeout)
         return result
 
+    async def render_isolated(
+        self, ctx: Optional[Context], timeout: float = 10.0, **variables
+    ) -> str:
+        """Render the template in a worker process, killing it on timeout.
+
+        Unlike `render_timed`, the timeout holds even if rendering never yields.
+        Variables must be picklable; the command context is passed
+        as a snapshot of what templates can access.
+        """
+        from .contexts import snapshot_context
+        from .worker import renderer
+
+        env: CommandEnvironment = self.environment
+        limits = {
+            "max_output_size": getattr(env, "max_output_size", None),
+            "max_operations": getattr(env, "max_operations", None),
+        }
+        snapshot = snapshot_context(ctx) if ctx is not None else None
+        return await renderer.render(self.source, snapshot, limits, variables, timeout)
+
     render_async = render
 
 
 class CommandEnvironment(SandboxedEnvironment):
+    # Resource limits for a single render. Set to None to disable.
+    # Operations are attribute/item lookups, calls, arithmetic, concatenation,
+    # loop iterations, and filters that can enlarge their input.
+    max_output_size: Optional[int] = 2**16
+    max_operations: Optional[int] = 200000
+
+    intercepted_binops = frozenset({"+", "*", "**"})
+
+    code_generator_class = CommandCodeGenerator
+
+    # Compiled templates are kept in an LRU cache keyed by a digest of the source,
+    # bounded by both the number of templates and their total source length.
+    compiled_cache_size: int = 256
+    compiled_cache_max_source: int = 2**20
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.globals["range"] = lambda *args: BudgetedRange(self, *args)
+        for name, estimate in SIZED_FILTERS.items():
+            self.filters[name] = self._size_limited(self.filters[name], estimate)
+        self._compiled: OrderedDict[tuple, tuple[int, CommandTemplate]]
+        self._compiled = OrderedDict()
+        self._compiled_source_size = 0
+
+    def _get_compiled(self, key: tuple) -> Optional[CommandTemplate]:
+        try:
+            size, tmpl = self._compiled[key]
+        except KeyError:
+            return None
+        self._compiled.move_to_end(key)
+        return tmpl
+
+    def _set_compiled(self, key: tuple, size: int, tmpl: CommandTemplate):
+        if size > self.compiled_cache_max_source:
+            return
+        self._compiled[key] = (size, tmpl)
+        self._compiled_source_size += size
+        while (
+            len(self._compiled) > self.compiled_cache_size
+            or self._compiled_source_size > self.compiled_cache_max_source
+        ):
+            _, (evicted, _) = self._compiled.popitem(last=False)
+            self._compiled_source_size -= evicted
+
+    def consume_operation(self):
+        """Count one operation against the current render's budget."""
+        budget = _operation_budget.get()
+        if budget is None:
+            return
+        budget[0] -= 1
+        if budget[0] < 0:
+            raise TemplateLimitExceeded(
+                f"Template exceeded {self.max_operations} operations."
+            )
+
+    def check_size(self, size: int):
+        """Raise if a value of this size would exceed the output size limit."""
+        if self.max_output_size is not None and size > self.max_output_size:
+            raise TemplateLimitExceeded(
+                f"Template produced a value larger than {self.max_output_size}."
+            )
+
+    def _size_limited(self, func: Callable, estimate: Callable[..., int]) -> Callable:
+        """Wrap a filter so that it counts as an operation and is subject\
+        to the output size limit, both before and after running it."""
+
+        async def check_async(result):
+            result = await result
+            self.check_size(len(result))
+            return result
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.consume_operation()
+            if self.max_output_size is not None:
+                self.check_size(estimate(*args, **kwargs))
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return check_async(result)
+            self.check_size(len(result))
+            return result
+
+        return wrapper
+
+    def budgeted_iter(self, iterable):
+        """Iterate over a `for` loop's iterable, counting each iteration\
+        against the current render's budget."""
+        consume = self.consume_operation
+
+        async def aiter_():
+            async for item in iterable:
+                consume()
+                yield item
+
+        def iter_():
+            for item in iterable:
+                consume()
+                yield item
+
+        if hasattr(iterable, "__aiter__"):
+            return aiter_()
+        return iter_()
+
+    def checked_concat(self, value: str) -> str:
+        """Count a `~` expression as an operation and check the size of its result."""
+        self.consume_operation()
+        self.check_size(len(value))
+        return value
+
+    def concat(self, chunks: Iterable[str]) -> str:
+        """Join the output of a block, checking its size as it accumulates.
+
+        Used for `{% set %}` blocks, macros and `{% filter %}` sections,
+        whose output doesn't go through the streaming check in `render`.
+        """
+        if self.max_output_size is None:
+            return "".join(chunks)
+        parts = []
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            self.check_size(size)
+            parts.append(chunk)
+        return "".join(parts)
+
+    def getattr(self, obj: Any, attribute: str):
+        self.consume_operation()
+        return super().getattr(obj, attribute)
+
+    def getitem(self, obj: Any, argument: Any):
+        self.consume_operation()
+        return super().getitem(obj, argument)
+
+    def call(__self, __context: Context, __obj: Any, *args: Any, **kwargs: Any):
+        __self.consume_operation()
+        return super().call(__context, __obj, *args, **kwargs)
+
+    def call_binop(self, context: Context, operator: str, left: Any, right: Any):
+        self.consume_operation()
+        sized = (str, bytes, list, tuple)
+        if operator == "*":
+            if isinstance(left, sized) and isinstance(right, int):
+                self.check_size(len(left) * right)
+            elif isinstance(right, sized) and isinstance(left, int):
+                self.check_size(len(right) * left)
+        elif operator == "+":
+            if isinstance(left, sized) and isinstance(right, sized):
+                self.check_size(len(left) + len(right))
+        elif operator == "**":
+            if isinstance(left, int) and isinstance(right, int) and right > 0:
+                # Approximate number of digits in the result
+                self.check_size(left.bit_length() * right // 3)
+        return super().call_binop(context, operator, left, right)
+
     def from_string(
         self,
         source: Union[str, CommandTemplate],
@@ -83,8 +417,17 @@ class CommandEnvironment(SandboxedEnvironment):
         template_class: Optional[type[CommandTemplate]] = CommandTemplate,
     ) -> CommandTemplate:
         tmpl: CommandTemplate
+        key = None
+        if globals is None and isinstance(source, str):
+            digest = blake2b(source.encode(), digest_size=20).digest()
+            key = (template_class, digest)
+            tmpl = self._get_compiled(key)
+            if tmpl is not None:
+                return tmpl
         tmpl = super().from_string(source, globals, template_class)
         tmpl.source = source
+        if key is not None:
+            self._set_compiled(key, len(source), tmpl)
         return tmpl
 
 
@@ -103,7 +446,12 @@ def make_environment(
     options.setdefault("undefined", StrictUndefined)
     options.setdefault("extensions", ["jinja2.ext.do"])
     options["enable_async"] = True
+    limits = {
+        k: options.pop(k) for k in ("max_output_size", "max_operations") if k in options
+    }
     env = env_cls(**options)
+    for k, v in limits.items():
+        setattr(env, k, v)
     env.context_class = ctx_cls
     register_filters(env)
     return env
@@ -20,11 +20,64 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from __future__ import annotations
+
+from dataclasses import dataclass
 from typing import Optional
 
 import discord as d
 from markupsafe import Markup
 
+# Plain, picklable copies of the discord.py attributes the wrappers below read,
+# used to pass variables to templates rendered in another process.
+
+
+@dataclass(frozen=True)
+class ColorData:
+    value: int
+
+    @classmethod
+    def from_discord(cls, color: d.Colour) -> ColorData:
+        return cls(color.value)
+
+
+@dataclass(frozen=True)
+class MemberData:
+    id: int
+    discriminator: str
+    display_name: str
+    name: Optional[str]
+    nick: Optional[str]
+    mention: str
+    color: ColorData
+
+    @classmethod
+    def from_discord(cls, member: d.Member) -> MemberData:
+        return cls(
+            id=member.id,
+            discriminator=member.discriminator,
+            display_name=member.display_name,
+            name=member.name,
+            nick=getattr(member, "nick", None),
+            mention=member.mention,
+            color=ColorData.from_discord(member.color),
+        )
+
+
+@dataclass(frozen=True)
+class MessageData:
+    id: int
+    author: MemberData
+    content: str
+
+    @classmethod
+    def from_discord(cls, message: d.Message) -> MessageData:
+        return cls(
+            id=message.id,
+            author=MemberData.from_discord(message.author),
+            content=message.content,
+        )
+
 
 class Color:
     def __init__(self, color: d.Colour):
@@ -44,6 +97,8 @@ class Member:
         self._member = member
 
     def __str__(self):
+        if isinstance(self._member, MemberData):
+            return f"{self._member.name}#{self._member.discriminator}"
         return str(self._member)
 
     @property
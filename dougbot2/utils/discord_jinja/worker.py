@@ -0,0 +1,99 @@
+# MIT License
+#
+# Copyright (c) 2021 @tonyzbf +https://github.com/tonyzbf/
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from .contexts import ContextSnapshot
+
+MAX_WORKERS = 2
+
+
+def _render(
+    source: str,
+    context: Optional[ContextSnapshot],
+    limits: dict[str, Optional[int]],
+    variables: dict[str, Any],
+) -> str:
+    from .env import get_environment
+
+    env = get_environment()
+    for k, v in limits.items():
+        setattr(env, k, v)
+    tmpl = env.from_string(source)
+    return asyncio.run(tmpl.render(context, **variables))
+
+
+class IsolatedRenderer:
+    """Render templates in a small pool of worker processes.
+
+    A template that never yields cannot be interrupted by `asyncio.wait_for`
+    and would block the event loop until it finishes. Rendering it in another
+    process keeps the loop responsive, and on timeout the workers are killed
+    outright. Killing the pool also fails any other render in progress,
+    which is acceptable for the rare case of a runaway template.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs other threads is unsafe
+            mp_context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=mp_context)
+        return self._pool
+
+    def kill(self):
+        """Terminate all workers immediately."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        for process in [*(pool._processes or {}).values()]:
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render(
+        self,
+        source: str,
+        context: Optional[ContextSnapshot],
+        limits: dict[str, Optional[int]],
+        variables: dict[str, Any],
+        timeout: float,
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.get_pool(), _render, source, context, limits, variables
+        )
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            raise
+
+
+renderer = IsolatedRenderer()
@@ -3,5 +3,5 @@
 __version__ = "0.0.1"
 
 from .color import Color2
-from .embeds import Embed2
+from .embeds import Embed2, Embed2Builder
 from .permissions import PermissionOverride, Permissions2
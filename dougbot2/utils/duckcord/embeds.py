@@ -66,9 +66,12 @@ class _Serializable:
             raise ValueError(f"Cannot convert {info} to {cls}") from e
 
     def to_dict(self) -> dict:
-        return attr.asdict(
-            self, recurse=True, filter=attr.filters.exclude(type(Embed.Empty))
-        )
+        info = {}
+        for att in self.__attrs_attrs__:
+            value = getattr(self, att.name)
+            if type(value) is not _EmptyType:
+                info[att.name] = value
+        return info
 
     def for_json(self) -> dict:
         return self.to_dict()
@@ -236,6 +239,14 @@ class Embed2:
 
     type: str = attr.ib(default="rich")
 
+    # Embeds are immutable, so these are computed at most once per instance.
+    # Not passed to attr.evolve, so derived embeds start with an empty cache.
+    _serialized: dict | None = attr.ib(
+        init=False, default=None, eq=False, repr=False
+    )
+    _size: int | None = attr.ib(init=False, default=None, eq=False, repr=False)
+    _checked: bool = attr.ib(init=False, default=False, eq=False, repr=False)
+
     @property
     def colour(self):
         return self.color
@@ -271,15 +282,24 @@ class Embed2:
     def to_dict(self, ensure_limits=True) -> dict:
         """Serialize the embed to a :class:`dict`.
 
+        The result is computed once and cached; it is shared between calls
+        and should not be modified.
+
         :return: The result dictionary
         :rtype: :class:`dict`
         """
-        if ensure_limits:
+        if ensure_limits and not self._checked:
             self.check_oversized()
+            object.__setattr__(self, "_checked", True)
 
-        info = attr.asdict(
-            self, recurse=True, filter=attr.filters.exclude(type(Embed.Empty))
-        )
+        info = self._serialized
+        if info is None:
+            info = self._serialize()
+            object.__setattr__(self, "_serialized", info)
+        return info
+
+    def _serialize(self) -> dict:
+        info = {}
 
         timestamp = self.timestamp
         if isinstance(timestamp, datetime):
@@ -289,8 +309,34 @@ class Embed2:
         if isinstance(color, Colour):
             info["color"] = color.value
 
+        info["fields"] = [f.to_dict() for f in self.fields]
+
+        for key in ("title", "description", "url"):
+            value = getattr(self, key)
+            if type(value) is not _EmptyType:
+                info[key] = value
+
+        for key in ("author", "footer", "image", "thumbnail", "video", "provider"):
+            value: _Serializable = getattr(self, key)
+            if type(value) is not _EmptyType:
+                info[key] = value.to_dict()
+
+        info["type"] = self.type
         return info
 
+    def builder(self) -> Embed2Builder:
+        """Return a mutable :class:`Embed2Builder` initialized with this embed.
+
+        Use a builder instead of chaining when setting many attributes (such as
+        adding many fields in a loop): changes are collected and the
+        resulting embed is converted and validated only once in
+        :meth:`Embed2Builder.build`.
+
+        :return: The builder.
+        :rtype: :class:`Embed2Builder`
+        """
+        return Embed2Builder(self)
+
     def copy(self) -> Embed2:
         """Return a copy of this embed object.
 
@@ -524,15 +570,19 @@ class Embed2:
             self.footer.check_oversized()
 
     def __len__(self) -> int:
-        return sum(
-            [
-                len(self.title),
-                len(self.description),
-                sum(len(f) for f in self.fields),
-                len(self.footer),
-                len(self.author),
-            ]
-        )
+        size = self._size
+        if size is None:
+            size = sum(
+                [
+                    len(self.title),
+                    len(self.description),
+                    sum(len(f) for f in self.fields),
+                    len(self.footer),
+                    len(self.author),
+                ]
+            )
+            object.__setattr__(self, "_size", size)
+        return size
 
     def __str__(self) -> str:
         lines = []
@@ -546,6 +596,163 @@ class Embed2:
         return "\n".join(lines)
 
 
+class Embed2Builder:
+    """Mutable builder for :class:`Embed2`.
+
+    Has the same "mutation" methods as :class:`Embed2`, except that they
+    modify the builder in place (and return the builder for chaining).
+    Call :meth:`build` to get the resulting immutable embed:
+
+    .. code-block:: python
+
+        builder = Embed2(title='Roles').builder()
+        for role in roles:
+            builder.add_field(name=role.name, value=role.mention)
+        embed = builder.set_timestamp().build()
+    """
+
+    def __init__(self, base: Embed2 | None = None) -> None:
+        self._base = base if base is not None else Embed2()
+        self._changes: dict[str, Any] = {}
+        self._fields: list[EmbedField] | None = None
+
+    def _set(self, **changes) -> Embed2Builder:
+        self._changes.update(changes)
+        return self
+
+    def _get(self, key: str):
+        try:
+            return self._changes[key]
+        except KeyError:
+            return getattr(self._base, key)
+
+    @property
+    def fields(self) -> list[EmbedField]:
+        """The fields of the embed being built, copied on first access."""
+        if self._fields is None:
+            self._fields = [*self._base.fields]
+        return self._fields
+
+    def build(self) -> Embed2:
+        """Create the embed, running conversions and validations once.
+
+        :return: The resulting embed.
+        :rtype: :class:`Embed2`
+        """
+        changes = {**self._changes}
+        if self._fields is not None:
+            changes["fields"] = self._fields
+        if not changes:
+            return self._base
+        return attr.evolve(self._base, **changes)
+
+    def add_field(self, *, name: str, value: str, inline: bool = True):
+        """Same as :meth:`Embed2.add_field`, but modify the builder in place."""
+        self.fields.append(EmbedField(name=name, value=value, inline=inline))
+        return self
+
+    def insert_field_at(
+        self, index: int, *, name: str, value: str, inline: bool = True
+    ):
+        """Same as :meth:`Embed2.insert_field_at`, but modify the builder in place."""
+        self.fields.insert(index, EmbedField(name=name, value=value, inline=inline))
+        return self
+
+    def set_field_at(self, index: int, *, name: str, value: str, inline: bool = True):
+        """Same as :meth:`Embed2.set_field_at`, but modify the builder in place."""
+        field = EmbedField(name=name, value=value, inline=inline)
+        fields = self.fields
+        if -len(fields) <= index < len(fields):
+            fields[index] = field
+        else:
+            fields.append(field)
+        return self
+
+    def clear_fields(self):
+        """Same as :meth:`Embed2.clear_fields`, but modify the builder in place."""
+        self._fields = []
+        return self
+
+    def set_timestamp(self, timestamp: datetime | None = attr.NOTHING):
+        """Same as :meth:`Embed2.set_timestamp`, but modify the builder in place."""
+        if timestamp is attr.NOTHING:
+            return self._set(timestamp=utcnow())
+        elif timestamp is None:
+            return self._set(timestamp=_EMPTY)
+        return self._set(timestamp=timestamp)
+
+    def set_author(
+        self, *, name: str | None, url: str = _EMPTY, icon_url: str = _EMPTY
+    ):
+        """Same as :meth:`Embed2.set_author`, but modify the builder in place."""
+        return self._set(author=EmbedAuthor(name, url, icon_url))
+
+    def remove_author(self):
+        """Same as :meth:`Embed2.remove_author`, but modify the builder in place."""
+        return self._set(author=_EMPTY)
+
+    def set_footer(self, *, text: str | None, icon_url=_EMPTY):
+        """Same as :meth:`Embed2.set_footer`, but modify the builder in place."""
+        if not text:
+            return self._set(footer=_EMPTY)
+        return self._set(footer=EmbedFooter(text, icon_url))
+
+    def set_image(self, *, url: str | None):
+        """Same as :meth:`Embed2.set_image`, but modify the builder in place."""
+        return self._set(image=EmbedAttachment(url) if url else _EMPTY)
+
+    def set_video(self, *, url: str | None):
+        """Same as :meth:`Embed2.set_video`, but modify the builder in place."""
+        return self._set(video=EmbedAttachment(url) if url else _EMPTY)
+
+    def set_thumbnail(self, *, url: str | None):
+        """Same as :meth:`Embed2.set_thumbnail`, but modify the builder in place."""
+        return self._set(thumbnail=EmbedAttachment(url) if url else _EMPTY)
+
+    def set_color(self, color: int | Colour | None):
+        """Same as :meth:`Embed2.set_color`, but modify the builder in place."""
+        return self._set(color=color)
+
+    def set_title(self, title: str | None):
+        """Same as :meth:`Embed2.set_title`, but modify the builder in place."""
+        return self._set(title=title)
+
+    def set_description(self, description: str | None):
+        """Same as :meth:`Embed2.set_description`, but modify the builder in place."""
+        return self._set(description=description)
+
+    def set_url(self, url: str | None):
+        """Same as :meth:`Embed2.set_url`, but modify the builder in place."""
+        return self._set(url=url)
+
+    def set_provider(self, name: str = _EMPTY, url: str = _EMPTY):
+        """Same as :meth:`Embed2.set_provider`, but modify the builder in place."""
+        return self._set(provider=EmbedProvider(name=name, url=url))
+
+    def use_as_author(self, user: User):
+        """Same as :meth:`Embed2.use_as_author`, but modify the builder in place."""
+        return self.set_author(name=str(user), icon_url=user.avatar_url)
+
+    def use_member_color(self, member: Member):
+        """Same as :meth:`Embed2.use_member_color`, but modify the builder in place."""
+        return self.set_color(member.color)
+
+    def personalized(self, person: User | Member, *, url: str = _EMPTY):
+        """Same as :meth:`Embed2.personalized`, but modify the builder in place."""
+        author = EmbedAuthor(name=str(person), url=url, icon_url=person.avatar_url)
+        return self._set(author=author, color=person.color)
+
+    def decorated(self, guild: Guild, *, url: str = _EMPTY):
+        """Same as :meth:`Embed2.decorated`, but modify the builder in place."""
+        author = EmbedAuthor(name=str(guild), url=url, icon_url=guild.icon_url)
+        return self._set(author=author)
+
+    def set_author_url(self, url: str | None):
+        """Same as :meth:`Embed2.set_author_url`, but modify the builder in place."""
+        author = attr.evolve(self._get("author"), url=url)
+        return self._set(author=author)
+
+
 class EmbedOversizedError(ValueError):
     def __init__(self, component: str, limit: str, unit="characters"):
         super().__init__(f"{component} oversized: {limit} {unit}")
@@ -18,12 +18,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import threading
 import time
+from collections import defaultdict
 from collections.abc import Callable, Coroutine, Iterable
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
 from functools import wraps
 from typing import Any, Optional, Union
+from weakref import WeakKeyDictionary
 
 from discord import (
     Client,
@@ -38,6 +39,10 @@ from discord.ext.commands import Context
 
 from dougbot2.defaults import get_defaults
 
+MAX_BACKGROUND_RESPONDERS = 512
+
+_STOP = object()
+
 Decorator = Callable[[Callable], Callable]
 EventFilter = Callable[..., Coroutine[Any, Any, bool]]
 SyncEventFilter = Callable[..., bool]
@@ -93,16 +98,162 @@ def reaction_on(*ids: int):
 def emote_matches(*emotes: str | int):
     """Allow a reaction event if the emote used is one of the specified emotes."""
 
-    def check_emote(event: RawReactionActionEvent):
+    def check_emote(event: RawReactionActionEvent, emotes=frozenset(emotes)):
         id_ = event.emoji.id or event.emoji.name
         return id_ in emotes
 
     return check_emote
 
 
+class ReactionScheduler:
+    """Add reactions to messages through a fair, per-channel queue.
+
+    discord.py rate-limits reactions per channel, so adding many reactions
+    at once only makes requests wait on (and retry against) the same bucket.
+    Reactions to messages in the same channel are instead added at most
+    `concurrency` messages at a time, in the order they were requested,
+    and reactions on the same message are added in order.
+    """
+
+    def __init__(self, concurrency: int = 1) -> None:
+        self.concurrency = concurrency
+        self._slots: dict[int, list[asyncio.Semaphore | int]] = {}
+
+    @asynccontextmanager
+    async def _acquire(self, channel_id: int):
+        slot = self._slots.get(channel_id)
+        if slot is None:
+            slot = self._slots[channel_id] = [asyncio.Semaphore(self.concurrency), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                yield
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._slots[channel_id]
+
+    async def add_reactions(
+        self, message: Message, emotes: Iterable[Emoji | PartialEmoji | str]
+    ) -> list[Optional[Exception]]:
+        """Add reactions to a message in order.
+
+        Return a list containing, for each emote, the exception raised
+        while adding it, or None if it was added successfully.
+        """
+        results = []
+        async with self._acquire(message.channel.id):
+            for emote in emotes:
+                try:
+                    await message.add_reaction(emote)
+                except Exception as e:
+                    results.append(e)
+                else:
+                    results.append(None)
+        return results
+
+
+reaction_scheduler = ReactionScheduler()
+
+
+class ResponderRouter:
+    """Dispatch discord.py events to active responders.
+
+    Only one listener is registered with the client for each event type.
+    Responders are indexed by their `route_key` (the ID of the message
+    they are attached to) so that an event is only tested against responders
+    on the same message, instead of against every `wait_for` future
+    on the client. Responders without a route key receive every event.
+    """
+
+    def __init__(self, client: Client) -> None:
+        self.log = logging.getLogger("discord.responder")
+        self.client = client
+        self.routes: defaultdict[
+            str, defaultdict[Optional[int], set[Responder]]
+        ] = defaultdict(lambda: defaultdict(set))
+        self.listening: set[str] = set()
+
+    def _listen(self, event: str):
+        if event in self.listening:
+            return
+
+        async def listener(*args):
+            self.dispatch(event, *args)
+
+        self.client.add_listener(listener, f"on_{event}")
+        self.listening.add(event)
+
+    @staticmethod
+    def get_route_key(*args) -> Optional[int]:
+        """Find the message ID an event is about, if any."""
+        if not args:
+            return None
+        obj = args[0]
+        if isinstance(obj, Message):
+            return obj.id
+        return getattr(obj, "message_id", None)
+
+    def subscribe(self, responder: Responder):
+        """Start delivering events to this responder."""
+        for event in responder.events:
+            self._listen(event)
+            self.routes[event][responder.route_key].add(responder)
+
+    def unsubscribe(self, responder: Responder):
+        """Stop delivering events to this responder."""
+        for event in responder.events:
+            routes = self.routes[event]
+            subscribers = routes.get(responder.route_key)
+            if subscribers is None:
+                continue
+            subscribers.discard(responder)
+            if not subscribers:
+                del routes[responder.route_key]
+
+    def dispatch(self, event: str, *args):
+        """Deliver an event to all subscribing responders whose checks pass."""
+        routes = self.routes.get(event)
+        if not routes:
+            return
+        key = self.get_route_key(*args)
+        subscribers = [*routes.get(key, ())]
+        if key is not None:
+            subscribers.extend(routes.get(None, ()))
+        if not subscribers:
+            return
+        # Same convention as Client.wait_for
+        if len(args) == 1:
+            payload = args[0]
+        else:
+            payload = args
+        for responder in subscribers:
+            try:
+                matched = responder.events[event](*args)
+            except Exception as e:
+                self.log.debug(f"{type(e).__name__} while testing event: {e}\n")
+                continue
+            if matched:
+                responder.notify(payload)
+
+
+_routers: WeakKeyDictionary[Client, ResponderRouter] = WeakKeyDictionary()
+
+
+def get_router(client: Client) -> ResponderRouter:
+    """Get the responder router for this client, creating one if necessary."""
+    try:
+        return _routers[client]
+    except KeyError:
+        router = _routers[client] = ResponderRouter(client)
+        return router
+
+
 class Responder:
     """Wait for discord.py events and run a coroutine if there is a match."""
 
+    route_key: Optional[int] = None
+
     def __init__(
         self, events: dict[str, Callable[..., bool]], client: Client, ttl: float
     ) -> None:
@@ -111,6 +262,7 @@ class Responder:
         self.client = client
         self.ttl = ttl
         self.end: float
+        self._inbox: asyncio.Queue = asyncio.Queue()
 
     async def on_start(self):
         """Execute before the responder begins listening for events.
@@ -147,42 +299,44 @@ class Responder:
         except Exception:
             pass
 
+    def notify(self, args: Union[Any, tuple]):
+        """Queue a matching event to be handled by this responder."""
+        self._inbox.put_nowait(args)
+
+    def stop(self):
+        """Stop listening as soon as pending events are handled, then clean up."""
+        self._inbox.put_nowait(_STOP)
+
     async def run(self):
         """Listen for events."""
         self.end = time.perf_counter() + self.ttl
+        router = get_router(self.client)
+        router.subscribe(self)
 
-        while True:
-            ts = time.perf_counter()
-            if ts > self.end:
-                break
-            timeout = self.end - ts
-            listeners = {
-                self.client.wait_for(k, check=t, timeout=timeout)
-                for k, t in self.events.items()
-            }
-            futures = {asyncio.ensure_future(coro) for coro in listeners}
-            try:
-                done, pending = await asyncio.wait(
-                    futures, return_when=asyncio.FIRST_COMPLETED
-                )
-                first = done.pop()
-                args = first.result()
-            except asyncio.TimeoutError:
-                continue
-            finally:
-                for future in futures:
-                    future.cancel()
-                    with suppress(Exception):
-                        future.exception()
-
-            try:
-                stop = await self.handle(args)
-            except Exception as e:
-                self.log.debug(f"{type(e).__name__} while handling reactions: {e}\n")
-            else:
-                if stop:
+        try:
+            while True:
+                timeout = self.end - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    args = await asyncio.wait_for(self._inbox.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if args is _STOP:
                     break
 
+                try:
+                    stop = await self.handle(args)
+                except Exception as e:
+                    self.log.debug(
+                        f"{type(e).__name__} while handling reactions: {e}\n"
+                    )
+                else:
+                    if stop:
+                        break
+        finally:
+            router.unsubscribe(self)
+
         await self.cleanup()
 
     async def handle(self, args: Union[Any, tuple]) -> Optional[bool]:
@@ -222,16 +376,18 @@ class EmoteResponder(Responder):
             elif isinstance(e, (Emoji, PartialEmoji)):
                 self.emotes[e.id] = e
 
+        # Built once here instead of per event, since this is tested
+        # against every reaction on the message for the lifetime of the responder.
+        message_id = message.id
+        user_ids = frozenset(users)
+        emote_keys = frozenset(self.emotes)
+
         def test(evt: RawReactionActionEvent):
-            return all(
-                t(evt)
-                for t in (
-                    emote_no_bots,
-                    emote_matches(*self.emotes.keys()),
-                    reaction_from(*users),
-                    reaction_on(self.message.id),
-                )
-            )
+            if evt.message_id != message_id or evt.user_id not in user_ids:
+                return False
+            if not emote_no_bots(evt):
+                return False
+            return (evt.emoji.id or evt.emoji.name) in emote_keys
 
         events = {
             "raw_reaction_add": test,
@@ -239,10 +395,16 @@ class EmoteResponder(Responder):
         }
         super().__init__(events, *args, **kwargs)
 
+    @property
+    def route_key(self) -> int:
+        return self.message.id
+
     async def on_start(self):
         """Add all emotes on start."""
-        for emote in self.emotes:
-            await self.message.add_reaction(emote)
+        results = await reaction_scheduler.add_reactions(self.message, self.emotes)
+        for exc in results:
+            if exc is not None:
+                raise exc
         return True
 
     async def on_finish(self):
@@ -279,16 +441,41 @@ async def run_responders(*responders: Responder):
     return await asyncio.gather(*should_run, return_exceptions=True)
 
 
-def start_responders(*responders: Responder):
-    """Run responders concurrently in a new loop in a separate thread.
+_background: dict[asyncio.Task, tuple[Responder, ...]] = {}
+_stopping: set[asyncio.Task] = set()
 
-    Responders are responsible for thread safety.
-    """
-    loop = asyncio.get_running_loop()
 
-    def run():
-        future = asyncio.run_coroutine_threadsafe(run_responders(*responders), loop)
-        return future.result()
+def start_responders(*responders: Responder):
+    """Run responders concurrently in a background task in the current event loop.
 
-    thread = threading.Thread(target=run, daemon=True)
-    return thread.start()
+    At most `MAX_BACKGROUND_RESPONDERS` background tasks are kept;
+    when the limit is reached, responders in the oldest task are stopped early.
+    Stopped tasks are still tracked until they finish.
+    """
+    while len(_background) >= MAX_BACKGROUND_RESPONDERS:
+        task, oldest = next(iter(_background.items()))
+        del _background[task]
+        _stopping.add(task)
+        for r in oldest:
+            with suppress(Exception):
+                r.stop()
+
+    task = asyncio.get_running_loop().create_task(run_responders(*responders))
+    _background[task] = responders
+
+    def done(task: asyncio.Task):
+        _background.pop(task, None)
+        _stopping.discard(task)
+
+    task.add_done_callback(done)
+    return task
+
+
+async def stop_responders():
+    """Cancel all responders running in the background."""
+    tasks = [*_background, *_stopping]
+    _background.clear()
+    _stopping.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -16,7 +16,7 @@
 
 import enum
 import re
-from collections.abc import Callable, Iterable, Iterator, Sequence, Sized
+from collections.abc import Callable, Iterable, Iterator, Sized
 from typing import Generic, Optional, TypeVar, Union
 
 import attr
@@ -25,7 +25,8 @@ from discord.ext.commands import Context
 from more_itertools import peekable, split_before
 
 from ..defaults import get_defaults
-from .duckcord.embeds import Embed2, EmbedField
+from .datastructures import LazySequence
+from .duckcord.embeds import LEN_LIMIT_NUM_FIELDS, Embed2, EmbedField
 from .events import EmoteResponder
 from .markdown import strong
 
@@ -55,13 +56,26 @@ class ParagraphStream:
         self.sep = separator
         self.pre = pre
         self.blockquote = blockquote
+        self._len = 0
 
     def append(self, text: str):
         """Add text to the end of string."""
-        self.lines.extend(filter(None, text.split("\n")))
+        lines = [*filter(None, text.split("\n"))]
+        self.lines.extend(lines)
+        self._len += sum(len(s) for s in lines)
+
+    def extend(self, texts: Iterable[str]):
+        """Add multiple texts to the end of string."""
+        for text in texts:
+            self.append(text)
+
+    def clear(self):
+        """Remove all text."""
+        self.lines.clear()
+        self._len = 0
 
     def __len__(self) -> int:
-        return sum(len(s) for s in self.lines)
+        return self._len
 
     def __iter__(self) -> Iterator[str]:
         buffer = []
@@ -142,6 +156,13 @@ def chapterize_items(items: Iterable[Generic[S]], break_at: int) -> Iterable[lis
     return split_before(items, splitter)
 
 
+def shorten_list(items: list[str], size: int) -> list[str]:
+    """Keep the first `size` items of a list, replacing the rest with a count."""
+    if len(items) <= size:
+        return items
+    return [*items[:size], f"({len(items) - size} more)"]
+
+
 def chapterize_fields(
     fields: Iterable[EmbedField],
     pagesize: int = 720,
@@ -149,27 +170,36 @@ def chapterize_fields(
 ) -> Iterator[list[EmbedField]]:
     """Rearrange a list of embed fields and breaking fields longer than a certain size into\
     separate fields sharing the same name."""
-    if sum(len(f) for f in fields) < pagesize:
-        yield [*fields]
+    fields = [(f, len(f)) for f in fields]
+    if (
+        len(fields) <= LEN_LIMIT_NUM_FIELDS
+        and sum(size for f, size in fields) < pagesize
+    ):
+        yield [f for f, size in fields]
         return
     page: list[EmbedField] = []
+    page_size = 0
     fields = peekable(fields)
     while fields:
-        size = sum(len(f) for f in page)
-        next_field = fields.peek()
-        next_len = len(next_field)
-        if size and size + next_len > pagesize:
+        next_field, next_len = fields.peek()
+        if page and (
+            page_size and page_size + next_len > pagesize
+            or len(page) >= LEN_LIMIT_NUM_FIELDS
+        ):
             yield page
             page = []
+            page_size = 0
+        next(fields)
         if next_len > pagesize:
             head, *tails = [
                 *chapterize(next_field.value, pagesize, pred=linebreak, maxsplit=1)
             ]
-            next(fields)
-            page.append(attr.evolve(next_field, value=head))
-            fields.prepend(*[attr.evolve(next_field, value=v) for v in tails])
-        else:
-            page.append(next(fields))
+            next_field = attr.evolve(next_field, value=head)
+            next_len = len(next_field)
+            tails = [attr.evolve(next_field, value=v) for v in tails]
+            fields.prepend(*[(f, len(f)) for f in tails])
+        page.append(next_field)
+        page_size += next_len
     if page:
         yield page
 
@@ -264,10 +294,17 @@ class Pagination:
 
     Pagination objects are callable and returns a Paginator when called.
     Thus Pagination objects are reusable, while Paginators are not.
+
+    Pages may be passed as any iterable, including a generator; they are
+    produced lazily and only when a page is first navigated to. Pass a
+    `LazySequence` with a known length so that page numbers can be displayed
+    without producing every page.
     """
 
-    def __init__(self, content: Sequence[PageContent]) -> None:
-        self.content = content
+    def __init__(self, content: Iterable[PageContent]) -> None:
+        if not isinstance(content, LazySequence):
+            content = LazySequence(content)
+        self.content: LazySequence[PageContent] = content
         emotes = get_defaults().styles.emotes
         self.actions = {
             emotes.head: lambda idx: 0,
@@ -295,7 +332,7 @@ class Pagination:
         def provider(emote: PartialEmoji) -> PageContent:
             nonlocal index
             idx: int = self.actions[emote.name](index)
-            if idx < 0 or idx >= len(self.content) or idx == index:
+            if idx < 0 or idx == index or not self.content.has_index(idx):
                 return None, None
             index = idx
             return self[idx]
@@ -306,7 +343,7 @@ class Pagination:
         self, client: Client, message: Message, ttl: int, *users: Union[int, Member]
     ) -> Paginator:
         """Make a Paginator from this Pagination to be used in message replies."""
-        if len(self.content) > 1:
+        if self.content.has_index(1):
             return Paginator(
                 self.index_setter(),
                 client=client,
@@ -337,8 +374,8 @@ class Pagination:
 class TextPagination(Pagination):
     """A Pagination that provides only text content."""
 
-    def __init__(self, texts: Sequence[str], title: str) -> None:
-        super().__init__([(s, None) for s in texts])
+    def __init__(self, texts: Iterable[str], title: str) -> None:
+        super().__init__(LazySequence.map(lambda s: (s, None), texts))
         self.title = title
 
     def text_transform(self, idx: int, body: str) -> str:
@@ -352,9 +389,9 @@ class EmbedPagination(Pagination):
     """A Pagination that provides only embed content."""
 
     def __init__(
-        self, embeds: Sequence[Embed2], title: Optional[str], set_timestamp: bool = True
+        self, embeds: Iterable[Embed2], title: Optional[str], set_timestamp: bool = True
     ) -> None:
-        super().__init__([(None, e) for e in embeds])
+        super().__init__(LazySequence.map(lambda e: (None, e), embeds))
         self.title = title
         self.timestamp = set_timestamp
 
@@ -398,10 +435,10 @@ class EmbedPagination(Pagination):
     ):
         if not lines:
             lines = ["(none)"]
+        chapters = [*chapterize_items(lines, size)]
         return cls(
-            [
-                init(Embed2(description=newline.join(lines)))
-                for lines in chapterize_items(lines, size)
-            ],
+            LazySequence.map(
+                lambda lines: init(Embed2(description=newline.join(lines))), chapters
+            ),
             title,
         )
@@ -16,8 +16,8 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
+import time
 from collections.abc import Callable, Coroutine
 from contextlib import suppress
 from dataclasses import dataclass
@@ -34,18 +34,69 @@ from discord import (
     Message,
     MessageReference,
     PartialEmoji,
+    Permissions,
     TextChannel,
     User,
 )
+from discord.abc import Messageable
 from discord.ext.commands import Context
 
 from ..defaults import get_defaults
 from .duckcord.embeds import Embed2
-from .events import DeleteResponder, Responder, run_responders, start_responders
+from .events import (
+    DeleteResponder,
+    Responder,
+    reaction_scheduler,
+    run_responders,
+    start_responders,
+)
 from .markdown import tag
 
 logger = logging.getLogger("discord.utils.response")
 
+PERMISSION_CACHE_TTL = 30
+
+
+class PermissionCache:
+    """Short-lived cache of the bot's resolved permissions in guild channels.
+
+    Resolving permissions walks every role and overwrite that applies,
+    so the result is reused across responses sent to the same channel.
+    Entries expire after `ttl` seconds and should additionally be invalidated
+    when channel overwrites, roles, or the bot's own roles change.
+    """
+
+    def __init__(self, ttl: float = PERMISSION_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._cache: dict[int, dict[int, tuple[float, Permissions]]] = {}
+
+    def get(self, channel: Messageable, me: User) -> Permissions:
+        """Get the permissions of `me` in this channel."""
+        guild = getattr(channel, "guild", None)
+        if guild is None:
+            return channel.permissions_for(me)
+        channels = self._cache.setdefault(guild.id, {})
+        now = time.monotonic()
+        cached = channels.get(channel.id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        perms = channel.permissions_for(me)
+        channels[channel.id] = (now + self.ttl, perms)
+        return perms
+
+    def invalidate_channel(self, guild_id: int, channel_id: int) -> None:
+        """Forget cached permissions for this channel."""
+        channels = self._cache.get(guild_id)
+        if channels:
+            channels.pop(channel_id, None)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """Forget cached permissions for all channels in this guild."""
+        self._cache.pop(guild_id, None)
+
+
+permission_cache = PermissionCache()
+
 
 @dataclass
 class Fulfillment:
@@ -63,14 +114,16 @@ class Fulfillment:
 class ResponseInit:
     """Utility class for specifying common command responses with a fluent interface.
 
-    Each method except `run()` returns the object itself, allowing chaining.
+    Each method except `run()` modifies the object in place and returns it,
+    allowing chaining without allocating intermediate objects. The options are
+    frozen into a snapshot when `run()` is called.
     """
 
     context: Context = attr.ib()
 
     content: Optional[str] = attr.ib(default=None)
     embed: Optional[Embed2] = attr.ib(default=None)
-    files: list[File] = attr.ib(default=attr.Factory(list))
+    files: list[File] = attr.ib(factory=list, converter=lambda f: [*(f or ())])
     nonce: Optional[int] = attr.ib(default=None)
 
     delete_after: Optional[float] = attr.ib(default=None)
@@ -88,51 +141,40 @@ class ResponseInit:
 
     direct_message: bool = attr.ib(default=False)
 
-    @classmethod
-    def _attrs_filter(cls, att: attr.Attribute, val):
-        return att.name in {
-            "content",
-            "embed",
-            "files",
-            "delete_after",
-            "allowed_mentions",
-            "reference",
-            "mention_author",
-        }
-
     def mentions(self, mentions: AllowedMentions | None):
         """Set the `allowed_mentions` parameter of the outgoing message."""
         if mentions is None:
             mentions = AllowedMentions.none()
-        return attr.evolve(self, allowed_mentions=mentions)
+        self.allowed_mentions = mentions
+        return self
 
     def reply(self, notify: bool = False):
         """Use Discord's reply feature when sending the response."""
-        return attr.evolve(self, reference=self.context.message, mention_author=notify)
+        self.reference = self.context.message
+        self.mention_author = notify
+        return self
 
     def pingback(self):
         """Prepend the message content with a mention of the user calling the command."""
         content = self.content or ""
-        content = f"{tag(self.context.author)} {content}"
-        return attr.evolve(self, content=content)
+        self.content = f"{tag(self.context.author)} {content}"
+        return self
 
     def responder(self, responder_init: Callable[[Message], Responder]):
         """Add a Responder to listen for events after the message is sent.
 
         The callback should take the resulting message and return a Responder.
         """
-        init = attr.evolve(self)
-        init.responders = [*self.responders, responder_init]
-        return init
+        self.responders.append(responder_init)
+        return self
 
     def callback(self, cb: Callable[[Message], Coroutine[None, None, Any]]):
         """Add an arbitrary callback to be run after the message is sent.
 
         The callback should take the resulting message and return a coroutine.
         """
-        init = attr.evolve(self)
-        init.callbacks = [*self.callbacks, cb]
-        return init
+        self.callbacks.append(cb)
+        return self
 
     def deleter(self):
         """Enable the deleter responder for this response.
@@ -144,7 +186,8 @@ class ResponseInit:
 
     def autodelete(self, seconds: float):
         """Delete the response after this many seconds."""
-        return attr.evolve(self, delete_after=seconds)
+        self.delete_after = seconds
+        return self
 
     def suppress(self, suppress=True):
         """Suppress/allow embeds in the response as soon as the message is sent."""
@@ -159,18 +202,27 @@ class ResponseInit:
 
     def dm(self):
         """Set the response to DM the command caller instead of sending it to the current channel."""
-        return attr.evolve(self, direct_message=True)
+        self.direct_message = True
+        return self
 
     def success(self):
         """React to the command invocation with a green checkmark indicating success."""
-        return attr.evolve(
-            self, indicators=[*self.indicators, get_defaults().styles.emotes.success]
-        )
+        self.indicators.append(get_defaults().styles.emotes.success)
+        return self
 
     def failure(self):
         """React to the command invocation with a red cross indicating failure/error."""
+        self.indicators.append(get_defaults().styles.emotes.failure)
+        return self
+
+    def _freeze(self) -> ResponseInit:
+        """Take a snapshot of the current options to be used for delivery."""
         return attr.evolve(
-            self, indicators=[*self.indicators, get_defaults().styles.emotes.failure]
+            self,
+            files=[*self.files],
+            callbacks=(*self.callbacks,),
+            responders=(*self.responders,),
+            indicators=(*self.indicators,),
         )
 
     @property
@@ -182,11 +234,13 @@ class ResponseInit:
         return not self.content and not self.embed and not self.files
 
     async def _send_indicators(self) -> bool:
-        res = await asyncio.gather(
-            *[self.context.message.add_reaction(r) for r in self.indicators],
-            return_exceptions=True,
+        perms = permission_cache.get(self.context.channel, self.context.me)
+        if not perms.add_reactions:
+            return False
+        res = await reaction_scheduler.add_reactions(
+            self.context.message, self.indicators
         )
-        return not any(isinstance(r, Exception) for r in res)
+        return not any(res)
 
     async def _deliver(self) -> Fulfillment:
         """Deliver the response, with sensible permission tests."""
@@ -199,23 +253,33 @@ class ResponseInit:
             target = self.context.channel
 
         me: User = self.context.me
-        perms = target.permissions_for(me)
+        perms = permission_cache.get(target, me)
         fulfilled = Fulfillment.none()
         if not perms.send_messages:
             return fulfilled
 
-        params = attr.evolve(self)
-        if params.embed is not None:
+        content = self.content
+        embed = self.embed
+        files = self.files
+        if embed is not None:
             fulfilled.did_send_embed = perms.embed_links
             if not perms.embed_links:
-                params.content = "\n".join([params.content or "", str(params.embed)])
-                params.embed = None
-        if params.files:
+                content = "\n".join([content or "", str(embed)])
+                embed = None
+        if files:
             fulfilled.did_send_attachments = perms.attach_files
             if not perms.attach_files:
-                params.files = []
-
-        kwargs = attr.asdict(params, recurse=False, filter=self._attrs_filter)
+                files = []
+
+        kwargs = {
+            "content": content,
+            "embed": embed,
+            "files": files,
+            "delete_after": self.delete_after,
+            "allowed_mentions": self.allowed_mentions,
+            "reference": self.reference,
+            "mention_author": self.mention_author,
+        }
         try:
             msg = await target.send(**kwargs)
             fulfilled.message = msg
@@ -236,14 +300,17 @@ class ResponseInit:
 
         :param message: The message to react/listen, defaults to None
         :type message: Optional[Message], optional
-        :param thread: If True, run responders in a separate thread,
-            otherwise run them in the current event loop,
-            defaults to True
+        :param thread: If True, run responders in a background task
+            and return immediately, otherwise wait for them to finish,
+            defaults to False
         :type thread: bool, optional
         :return: The message that was sent and whether
             all embed, files, and reactions are sent successfully.
         :rtype: `Fulfillment`
         """
+        return await self._freeze()._run(message, thread)
+
+    async def _run(self, message: Optional[Message], thread: bool) -> Fulfillment:
         did_set_indicators = bool(self.indicators) and await self._send_indicators()
         fulfilled = Fulfillment.none()
         fulfilled.message = message